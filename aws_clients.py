@@ -0,0 +1,65 @@
+import threading
+from tracing import traced
+
+# 웜 컨테이너에서 재사용하는 AWS 클라이언트/리소스.
+# boto3는 가져오는 데만 수백 밀리초가 걸리므로 처음 사용할 때 가져오고 만듭니다.
+_clients = {}
+_tables = {}
+_dynamodb = None
+_lock = threading.Lock()
+
+# 소요 시간을 기록하는 DynamoDB 테이블 요청 메서드
+_TRACED_TABLE_METHODS = ('get_item', 'put_item', 'update_item', 'delete_item', 'query', 'scan')
+
+class _TracedTable:
+    """DynamoDB 테이블 객체를 감싸 요청 메서드의 소요 시간을 'dynamodb.<메서드>' 단계로 기록합니다."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getattr__(self, name):
+        attribute = getattr(self._table, name)
+        if name in _TRACED_TABLE_METHODS:
+            return traced(f"dynamodb.{name}")(attribute)
+        return attribute
+
+def get_client(service_name, region_name=None):
+    """
+    boto3 클라이언트를 반환합니다. 서비스/리전별로 한 번만 만들고 재사용합니다.
+    boto3 기본 세션은 스레드 간 동시 생성이 안전하지 않으므로 잠금 안에서 만듭니다.
+    """
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                import boto3
+                client = boto3.client(service_name, region_name=region_name)
+                _clients[key] = client
+    return client
+
+def get_dynamodb_table(table_name):
+    """DynamoDB 테이블 객체를 반환합니다. 테이블별로 한 번만 만들고 재사용합니다."""
+    global _dynamodb
+    table = _tables.get(table_name)
+    if table is None:
+        with _lock:
+            table = _tables.get(table_name)
+            if table is None:
+                if _dynamodb is None:
+                    import boto3
+                    _dynamodb = boto3.resource('dynamodb')
+                table = _TracedTable(_dynamodb.Table(table_name))
+                _tables[table_name] = table
+    return table
+
+def set_client(service_name, client, region_name=None):
+    """클라이언트를 교체합니다. 시뮬레이션에서 로컬 가짜 AWS 서비스를 사용할 때 호출합니다."""
+    with _lock:
+        _clients[(service_name, region_name)] = client
+
+def set_table(table_name, table):
+    """DynamoDB 테이블 객체를 교체합니다. 시뮬레이션에서 로컬 가짜 테이블을 사용할 때 호출합니다."""
+    with _lock:
+        _tables[table_name] = _TracedTable(table)
@@ -0,0 +1,197 @@
+"""
+각 Lambda 핸들러의 콜드 스타트 시간을 측정합니다.
+
+핸들러마다 새 파이썬 프로세스를 띄워 (1) 모듈을 가져오는 시간과 (2) 첫 호출 지연 시간을
+측정하고, 여러 번 반복한 중앙값을 출력합니다. 핸들러마다 두 가지 이벤트를 사용합니다.
+
+- 네트워크 호출 없이 끝나는 경로(지원하지 않는 이벤트, 잘못된 입력 등): 가져오기 비용만 측정
+- DynamoDB 테이블/boto3 클라이언트/Slack 세션을 처음 가져오는 경로: simulation/의 가짜 AWS와
+  가짜 Slack을 설치한 뒤 호출하여, 클라이언트를 처음 사용하는 단계까지의 지연을 측정
+  (가짜 서비스를 한 번도 호출하지 않으면 경고를 출력)
+
+사용법 (저장소 루트에서):
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --repeat 10 --output cold_start.json
+    python benchmarks/cold_start.py --baseline cold_start.json  # 기준보다 느려지면 종료 코드 1
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 가짜 서비스를 사용하는 이벤트의 대상 채널/사용자
+BENCH_CHANNEL_ID = 'C0BENCH'
+BENCH_USER = {
+    'id': 'U0BENCH',
+    'name': 'bench',
+    'deleted': False,
+    'is_bot': False,
+    'profile': {'display_name': '2025_bench_홍길동', 'real_name': '홍길동'}
+}
+BENCH_EVENT_BODY = {
+    'type': 'event_callback',
+    'event_id': 'EvBENCH0001',
+    'event': {'type': 'user_change', 'user': BENCH_USER}
+}
+
+# (이름, 모듈, 핸들러 함수, 첫 호출 이벤트, 가짜 AWS/Slack 설치 여부)
+HANDLERS = [
+    ('slack_invitor', 'slack_invitor', 'lambda_handler', {
+        'event': {'type': 'app_mention'}
+    }, False),
+    ('slack_invitor:user_change', 'slack_invitor', 'lambda_handler', {
+        'body': json.dumps(BENCH_EVENT_BODY)
+    }, True),
+    ('slack_invitor_worker', 'slack_invitor', 'worker_handler', {
+        'Records': []
+    }, False),
+    ('slack_invitor_worker:user_change', 'slack_invitor', 'worker_handler', {
+        'Records': [{'messageId': 'bench-1', 'body': json.dumps(BENCH_EVENT_BODY)}]
+    }, True),
+    ('slack_invitor_convention', 'slack_invitor_convention', 'lambda_handler', {
+        'command': '/set-convention', 'channel_id': BENCH_CHANNEL_ID, 'text': 'invalid convention'
+    }, False),
+    ('slack_invitor_convention:set', 'slack_invitor_convention', 'lambda_handler', {
+        'command': '/set-convention', 'channel_id': BENCH_CHANNEL_ID, 'text': '2025_bench_*'
+    }, True),
+    ('slack_invitor_invite_all', 'slack_invitor_invite_all', 'lambda_handler', {}, False),
+    ('slack_invitor_invite_all:channel', 'slack_invitor_invite_all', 'lambda_handler', {
+        'channel_id': BENCH_CHANNEL_ID, 'dry_run': True
+    }, True),
+    ('slack_recommend_convetion', 'slack_recommend_convetion', 'lambda_handler', {
+        'body': ''
+    }, False),
+    ('slack_recommend_convetion:recommend', 'slack_recommend_convetion', 'lambda_handler', {
+        'body': f'channel_id={BENCH_CHANNEL_ID}&channel_name=bench-new'
+    }, True)
+]
+
+# 자식 프로세스에서 실행하는 측정 코드
+# 가짜 서비스는 모듈을 가져온 뒤 설치하며, 설치 시간은 측정에 넣지 않음
+_CHILD = """
+import io, sys, json, time, importlib, contextlib
+module_name, handler_name, event, use_fakes = sys.argv[1], sys.argv[2], json.loads(sys.argv[3]), sys.argv[4] == '1'
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    module = importlib.import_module(module_name)
+imported = time.perf_counter()
+fakes = None
+if use_fakes:
+    from benchmarks.cold_start import install_fakes, count_fake_calls
+    with contextlib.redirect_stdout(io.StringIO()):
+        fakes = install_fakes()
+    calls_before = count_fake_calls(fakes)
+invoke_start = time.perf_counter()
+error = None
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        getattr(module, handler_name)(event, None)
+except Exception as e:
+    error = repr(e)
+invoked = time.perf_counter()
+fake_calls = count_fake_calls(fakes) - calls_before if use_fakes else None
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_invoke_ms': (invoked - invoke_start) * 1000,
+    'error': error,
+    'fake_calls': fake_calls
+}))
+"""
+
+def install_fakes():
+    """
+    가짜 AWS(DynamoDB/Lambda/SQS)와 가짜 Slack 세션을 설치하고 벤치마크 채널의 컨벤션을 넣습니다.
+    반환값: (install_fake_aws 결과, FakeSlackWorkspace)
+    """
+    import slack_client
+    from convention_store import DYNAMODB_TABLE
+    from simulation.fake_aws import install_fake_aws
+    from simulation.fake_slack import FakeSlackWorkspace
+    from simulation.run import seed_conventions
+
+    aws = install_fake_aws()
+    seed_conventions(aws['tables'][DYNAMODB_TABLE], {BENCH_CHANNEL_ID: '2025_bench_*'})
+    workspace = FakeSlackWorkspace([BENCH_USER], {BENCH_CHANNEL_ID: {'name': 'bench', 'members': set()}})
+    slack_client.set_session(workspace)
+    return aws, workspace
+
+def count_fake_calls(fakes):
+    """가짜 DynamoDB 요청, Lambda/SQS 호출, Slack API 호출 수의 합을 반환합니다."""
+    aws, workspace = fakes
+    return (
+        sum(sum(table.stats.values()) for table in aws['tables'].values())
+        + len(aws['lambda'].invocations)
+        + len(aws['sqs'].messages)
+        + sum(workspace.stats['calls'].values())
+        + len(workspace.stats['responses'])
+    )
+
+def measure(module_name, handler_name, event, use_fakes=False):
+    env = dict(os.environ)
+    env.setdefault('SLACK_BOT_TOKEN', 'xoxb-benchmark')
+    env.setdefault('AWS_DEFAULT_REGION', 'ap-northeast-2')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    # 바이트코드 캐시는 Lambda 배포 패키지에도 포함될 수 있으므로 그대로 사용
+    output = subprocess.run(
+        [sys.executable, '-c', _CHILD, module_name, handler_name, json.dumps(event), '1' if use_fakes else '0'],
+        env=env, cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def run(repeat):
+    results = {}
+    for name, module_name, handler_name, event, use_fakes in HANDLERS:
+        samples = [measure(module_name, handler_name, event, use_fakes) for _ in range(repeat)]
+        for error in {sample['error'] for sample in samples if sample['error']}:
+            print(f"{name}: first invocation raised {error}", file=sys.stderr)
+        # 클라이언트를 처음 가져오는 경로를 측정하려는 이벤트가 가짜 서비스를 호출하지 않았으면 경고
+        if use_fakes and not any(sample['fake_calls'] for sample in samples):
+            print(f"{name}: first invocation did not reach any AWS/Slack client", file=sys.stderr)
+        results[name] = {
+            key: round(statistics.median(sample[key] for sample in samples), 2)
+            for key in ('import_ms', 'first_invoke_ms')
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Lambda 핸들러 콜드 스타트 측정')
+    parser.add_argument('--repeat', type=int, default=5, help='핸들러별 측정 횟수 (중앙값 사용)')
+    parser.add_argument('--output', help='측정 결과를 저장할 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 이전 측정 결과 JSON 파일')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='기준 대비 허용 배수 (기본값: 1.25)')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"{'handler':<40}{'import (ms)':>14}{'first invoke (ms)':>20}")
+    for name, result in results.items():
+        line = f"{name:<40}{result['import_ms']:>14.2f}{result['first_invoke_ms']:>20.2f}"
+        previous = baseline.get(name)
+        if previous:
+            total = result['import_ms'] + result['first_invoke_ms']
+            previous_total = previous['import_ms'] + previous['first_invoke_ms']
+            line += f"   (baseline {previous_total:.2f} ms)"
+            if total > previous_total * args.tolerance:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        print(f"Cold start regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""
+컨벤션 매칭, 이벤트 파싱, 이벤트 처리, 일괄 초대의 처리 시간을 측정합니다.
+
+simulation/의 가상 워크스페이스와 가짜 Slack/DynamoDB를 사용하므로 네트워크나 AWS 자격 증명 없이 실행됩니다.
+측정 항목마다 여러 번 반복한 중앙값을 출력하며, --record로 커밋별 결과를 누적해 두면
+--baseline으로 이전 커밋보다 느려진 항목을 확인할 수 있습니다.
+
+사용법 (저장소 루트에서):
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --record benchmarks/results.jsonl
+    python benchmarks/throughput.py --baseline benchmarks/results.jsonl  # 기준보다 느려지면 종료 코드 1
+    python benchmarks/throughput.py --only match --scale 0.1
+"""
+import os
+import io
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+import datetime
+import statistics
+import contextlib
+import subprocess
+from urllib.parse import urlencode
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# 핸들러 모듈은 가져올 때 환경 변수를 읽으므로 가져오기 전에 설정
+# (페이지 사이 대기와 초대 토큰 버킷은 실제 Slack 속도 제한용이므로 측정에서 제외)
+os.environ.setdefault('USERS_LIST_PAGE_DELAY', '0')
+os.environ.setdefault('CHANNEL_MEMBERS_PAGE_DELAY', '0')
+os.environ.setdefault('SLACK_INVITE_RATE_PER_MINUTE', '1000000')
+os.environ.setdefault('SLACK_BOT_TOKEN', 'xoxb-benchmark')
+
+from simulation.fake_aws import install_fake_aws
+from simulation.fake_slack import FakeSlackWorkspace
+from simulation.workspace import generate_workspace
+from simulation.run import seed_conventions, make_user_change_event
+
+# (사용자 이름 수, 컨벤션 수)
+MATCH_SIZES = [(10_000, 100), (10_000, 1_000), (10_000, 10_000)]
+PARSE_ITERATIONS = 20_000
+EVENT_COUNT = 1_000
+EVENT_CONVENTIONS = 10_000
+BACKFILL_USERS = 10_000
+BACKFILL_CONVENTIONS = 500
+# 가짜 Slack API 호출마다 더하는 지연 시간 (초)
+BACKFILL_LATENCY = 0.005
+
+
+def quiet():
+    """측정 중 핸들러 로그 출력을 막습니다."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def scaled(value, scale):
+    return max(int(value * scale), 1)
+
+
+def bench_match(scale, repeat):
+    """N개 이름 × M개 컨벤션 매칭 처리량을 측정합니다. 인덱스 생성 시간은 따로 기록합니다."""
+    from convention_index import ConventionIndex
+
+    results = {}
+    for num_names, num_conventions in MATCH_SIZES:
+        num_names, num_conventions = scaled(num_names, scale), scaled(num_conventions, scale)
+        users, conventions, _ = generate_workspace(num_names, num_conventions, seed=1)
+        names = [user['profile']['real_name'] for user in users]
+
+        build_samples, match_samples = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            index = ConventionIndex(conventions.items())
+            built = time.perf_counter()
+            for name in names:
+                index.match(name)
+            matched = time.perf_counter()
+            build_samples.append(built - start)
+            match_samples.append(matched - built)
+
+        match_seconds = statistics.median(match_samples)
+        results[f"match_{num_names}x{num_conventions}"] = {
+            'build_ms': round(statistics.median(build_samples) * 1000, 2),
+            'match_ms': round(match_seconds * 1000, 2),
+            'names_per_second': round(num_names / match_seconds)
+        }
+    return results
+
+
+def parse_bodies():
+    """API Gateway로 들어오는 이벤트 본문 형식별 예시를 만듭니다."""
+    event_body = json.dumps(make_user_change_event({
+        'id': 'U0000001',
+        'name': 'user1',
+        'deleted': False,
+        'is_bot': False,
+        'profile': {'display_name': '', 'real_name': ''}
+    }, '2025_인하대_캡스톤_홍길동', 1))
+    form_body = urlencode({
+        'token': 'verification-token',
+        'team_id': 'T0000001',
+        'channel_id': 'C0000001',
+        'channel_name': '2025-capstone',
+        'user_id': 'U0000001',
+        'command': '/set-convention',
+        'text': '2025_인하대_캡스톤_*',
+        'response_url': 'https://hooks.slack.com/commands/T0000001/1/abc'
+    })
+    return {
+        'json': {'body': event_body, 'isBase64Encoded': False},
+        'base64_json': {'body': base64.b64encode(event_body.encode('utf-8')).decode('ascii'), 'isBase64Encoded': True},
+        'form': {'body': form_body, 'isBase64Encoded': False},
+        'base64_form': {'body': base64.b64encode(form_body.encode('utf-8')).decode('ascii'), 'isBase64Encoded': True}
+    }
+
+
+def bench_parse(scale, repeat):
+    """parse_slack_event의 본문 형식별 호출당 시간을 측정합니다."""
+    from slack_invitor import parse_slack_event
+
+    iterations = scaled(PARSE_ITERATIONS, scale)
+    results = {}
+    for kind, event in parse_bodies().items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                parse_slack_event(event)
+            samples.append(time.perf_counter() - start)
+        results[f"parse_{kind}"] = {
+            'us_per_call': round(statistics.median(samples) / iterations * 1_000_000, 2)
+        }
+    return results
+
+
+def bench_events(scale, repeat):
+    """이름 변경 이벤트를 slack_invitor.lambda_handler로 처리하는 시간(check_and_invite_user 포함)을 측정합니다."""
+    import slack_invitor
+    from convention_store import DYNAMODB_TABLE, match_conventions
+
+    num_events = scaled(EVENT_COUNT, scale)
+    users, conventions, channels = generate_workspace(scaled(EVENT_CONVENTIONS * 2, scale), scaled(EVENT_CONVENTIONS, scale), seed=2)
+    rng = random.Random(2)
+    renamed = [(rng.choice(users), rng.choice(users)['profile']['real_name']) for _ in range(num_events)]
+
+    samples = []
+    for run_index in range(repeat):
+        aws = install_fake_aws()
+        import slack_client
+        slack_client.set_session(FakeSlackWorkspace(users, {
+            channel_id: {'name': channel['name'], 'members': set(channel['members'])}
+            for channel_id, channel in channels.items()
+        }))
+        seed_conventions(aws['tables'][DYNAMODB_TABLE], conventions)
+
+        events = [
+            {'body': json.dumps(make_user_change_event(user, new_name, run_index * num_events + position))}
+            for position, (user, new_name) in enumerate(renamed)
+        ]
+        with quiet():
+            # 첫 이벤트에서 컨벤션 인덱스를 만들므로 웜 컨테이너 상태를 측정하도록 미리 한 번 처리
+            match_conventions(aws['tables'][DYNAMODB_TABLE], '')
+            start = time.perf_counter()
+            for event in events:
+                slack_invitor.lambda_handler(event, None)
+            samples.append(time.perf_counter() - start)
+
+    return {
+        f"events_{num_events}": {
+            'ms_per_event': round(statistics.median(samples) / num_events * 1000, 3)
+        }
+    }
+
+
+def bench_backfill(scale, repeat, latency):
+    """지연 시간을 넣은 가짜 Slack API로 모든 채널 일괄 초대의 전체 시간을 측정합니다."""
+    import slack_client
+    import slack_invitor_invite_all
+    from convention_store import DYNAMODB_TABLE
+
+    num_users, num_conventions = scaled(BACKFILL_USERS, scale), scaled(BACKFILL_CONVENTIONS, scale)
+
+    samples, invited = [], 0
+    for _ in range(repeat):
+        # 초대하면 가짜 워크스페이스와 테이블 상태가 바뀌므로 매번 새로 만듦
+        users, conventions, channels = generate_workspace(num_users, num_conventions, seed=3)
+        aws = install_fake_aws()
+        workspace = FakeSlackWorkspace(users, channels, latency=latency)
+        slack_client.set_session(workspace)
+        seed_conventions(aws['tables'][DYNAMODB_TABLE], conventions)
+
+        with quiet():
+            start = time.perf_counter()
+            slack_invitor_invite_all.lambda_handler({'all_channels': True}, None)
+            samples.append(time.perf_counter() - start)
+        invited = workspace.stats['invited']
+
+    return {
+        f"backfill_{num_users}x{num_conventions}": {
+            'wall_seconds': round(statistics.median(samples), 3),
+            'invited': invited
+        }
+    }
+
+
+BENCHMARKS = ('match', 'parse', 'events', 'backfill')
+
+# 항목별로 비교하는 값과, 값이 클수록 느린지 여부
+TIMING_KEYS = {
+    'match_ms': True,
+    'us_per_call': True,
+    'ms_per_event': True,
+    'wall_seconds': True,
+    'names_per_second': False
+}
+
+
+def run(only, scale, repeat, latency):
+    results = {}
+    if 'match' in only:
+        results.update(bench_match(scale, repeat))
+    if 'parse' in only:
+        results.update(bench_parse(scale, repeat))
+    if 'events' in only:
+        results.update(bench_events(scale, repeat))
+    if 'backfill' in only:
+        results.update(bench_backfill(scale, repeat, latency))
+    return results
+
+
+def git_commit():
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except Exception:
+        return None
+
+
+def load_baseline(path):
+    """기준 결과를 읽습니다. --record로 누적한 JSONL 파일이면 마지막 기록을 사용합니다."""
+    with open(path) as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines:
+        return {}
+    if path.endswith('.jsonl'):
+        return json.loads(lines[-1])['results']
+    return json.loads('\n'.join(lines))
+
+
+def is_regression(key, value, previous, tolerance):
+    if TIMING_KEYS[key]:
+        return value > previous * tolerance
+    return value * tolerance < previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description='매칭/파싱/이벤트 처리/일괄 초대 처리 시간 측정')
+    parser.add_argument('--only', action='append', choices=BENCHMARKS, help='실행할 항목 (여러 번 지정 가능, 기본값: 전체)')
+    parser.add_argument('--scale', type=float, default=1.0, help='워크스페이스/반복 크기 배율')
+    parser.add_argument('--repeat', type=int, default=3, help='항목별 측정 횟수 (중앙값 사용)')
+    parser.add_argument('--latency', type=float, default=BACKFILL_LATENCY, help='일괄 초대 측정에서 Slack API 호출마다 더하는 지연 시간 (초)')
+    parser.add_argument('--output', help='측정 결과를 저장할 JSON 파일')
+    parser.add_argument('--record', help='커밋/시각과 함께 측정 결과를 한 줄씩 추가할 JSONL 파일')
+    parser.add_argument('--baseline', help='비교할 이전 측정 결과 (JSON 또는 --record로 만든 JSONL)')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='기준 대비 허용 배수 (기본값: 1.25)')
+    args = parser.parse_args()
+
+    results = run(args.only or BENCHMARKS, args.scale, args.repeat, args.latency)
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name) or {}
+        parts = []
+        for key, value in result.items():
+            part = f"{key}={value}"
+            if key in TIMING_KEYS and key in previous:
+                part += f" (baseline {previous[key]})"
+                if is_regression(key, value, previous[key], args.tolerance):
+                    regressions.append(f"{name}.{key}")
+                    part += ' REGRESSION'
+            parts.append(part)
+        print(f"{name:<28}{'  '.join(parts)}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.record:
+        with open(args.record, 'a') as f:
+            f.write(json.dumps({
+                'commit': git_commit(),
+                'recorded_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': sys.version.split()[0],
+                'scale': args.scale,
+                'results': results
+            }, ensure_ascii=False) + '\n')
+
+    if regressions:
+        print(f"Throughput regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import os
+import time
+from aws_clients import get_dynamodb_table
+
+# 환경 변수
+CHANNEL_MEMBERS_TABLE = os.environ.get('CHANNEL_MEMBERS_TABLE', 'slack-invitor-channel-members')
+# 캐시와 관계없이 conversations.members를 다시 크롤링하여 일관성을 확인하는 주기 (초)
+CHANNEL_MEMBERS_RECRAWL_INTERVAL = int(os.environ.get('CHANNEL_MEMBERS_RECRAWL_INTERVAL', str(24 * 3600)))
+
+def get_membership_table():
+    """채널 멤버십 캐시 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(CHANNEL_MEMBERS_TABLE)
+
+def get_cached_members(table, channel_id):
+    """
+    캐시된 채널 멤버 집합을 반환합니다.
+    캐시가 없거나 마지막 전체 크롤링이 CHANNEL_MEMBERS_RECRAWL_INTERVAL보다 오래되었으면 None을 반환합니다.
+    """
+    try:
+        response = table.get_item(
+            Key={
+                'channel_id': channel_id
+            }
+        )
+    except Exception as e:
+        print(f"Error reading channel membership cache: {str(e)}")
+        return None
+
+    item = response.get('Item')
+    if not item or 'crawled_at' not in item:
+        return None
+    if time.time() - int(item['crawled_at']) >= CHANNEL_MEMBERS_RECRAWL_INTERVAL:
+        return None
+    return set(item.get('members', ()))
+
+def store_members(table, channel_id, members, crawled_at):
+    """전체 크롤링 결과로 채널 멤버 캐시를 덮어씁니다. crawled_at은 크롤링을 시작한 시각입니다."""
+    item = {
+        'channel_id': channel_id,
+        'crawled_at': int(crawled_at)
+    }
+    # DynamoDB는 빈 집합을 저장할 수 없음
+    if members:
+        item['members'] = set(members)
+
+    try:
+        table.put_item(Item=item)
+    except Exception as e:
+        print(f"Error storing channel membership cache: {str(e)}")
+
+def add_members(table, channel_id, user_ids):
+    """채널에 들어온 사용자를 캐시에 추가합니다."""
+    if not user_ids:
+        return
+
+    try:
+        table.update_item(
+            Key={
+                'channel_id': channel_id
+            },
+            UpdateExpression='ADD members :members',
+            ExpressionAttributeValues={
+                ':members': set(user_ids)
+            }
+        )
+    except Exception as e:
+        print(f"Error adding to channel membership cache: {str(e)}")
+
+def remove_members(table, channel_id, user_ids):
+    """채널에서 나간 사용자를 캐시에서 제거합니다."""
+    if not user_ids:
+        return
+
+    try:
+        table.update_item(
+            Key={
+                'channel_id': channel_id
+            },
+            UpdateExpression='DELETE members :members',
+            ExpressionAttributeValues={
+                ':members': set(user_ids)
+            }
+        )
+    except Exception as e:
+        print(f"Error removing from channel membership cache: {str(e)}")
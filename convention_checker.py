@@ -0,0 +1,130 @@
+import os
+from convention_index import ConventionIndex, find_common_name, affixes_compatible
+from convention_pattern import compile_convention, source_affixes
+from member_snapshot import get_snapshot_table, scan_member_records, is_active_record
+
+# 추천 컨벤션이 현재 멤버 중 이 비율보다 많이 일치하면 너무 넓은 패턴으로 보고 제외
+RECOMMENDATION_MAX_MATCH_RATIO = float(os.environ.get('RECOMMENDATION_MAX_MATCH_RATIO', '0.5'))
+
+
+def clean_model_output(text):
+    """
+    모델 응답에서 컨벤션 패턴만 꺼냅니다.
+    첫 번째 비어 있지 않은 줄의 첫 단어를 사용하고, 앞뒤의 따옴표/백틱/마침표를 제거합니다.
+    """
+    for line in (text or '').splitlines():
+        words = line.strip().strip('`"\'').split()
+        if words:
+            return words[0].strip('`"\'.,')
+    return ''
+
+
+def local_candidates(channel_name):
+    """
+    Bedrock 없이 채널 이름으로 만들 수 있는 후보 컨벤션 목록을 반환합니다.
+    (`이름*`은 `이름_*`을 포함하므로 `이름_*`이 충돌하면 함께 충돌하여 후보에 넣지 않음)
+    """
+    return [f"{channel_name.lower()}_*"]
+
+
+def repair_candidates(candidate, channel_name):
+    """
+    모델이 추천한 컨벤션과, 충돌할 경우 대신 시도할 후보를 순서대로 반환합니다.
+    끝의 와일드카드 앞에 구분자(_)를 넣어 범위를 좁힌 패턴과 채널 이름으로 만든 패턴을 시도합니다.
+    """
+    candidates = []
+    if candidate:
+        candidates.append(candidate)
+        if candidate.endswith('*') and not candidate.endswith('_*') and len(candidate) > 1:
+            candidates.append(candidate[:-1] + '_*')
+    candidates.extend(local_candidates(channel_name))
+
+    unique = []
+    for convention in candidates:
+        if convention not in unique:
+            unique.append(convention)
+    return unique
+
+
+def iter_conflicts(candidate, existing_conventions, channel_id=None):
+    """
+    후보 컨벤션과 함께 일치하는 이름이 있는 다른 채널의 컨벤션을 하나씩 생성합니다.
+    후보는 한 번만 컴파일하고, 원문의 리터럴 접두사/접미사가 후보와 어긋나는 컨벤션은
+    컴파일과 곱 오토마톤 탐색 없이 건너뜁니다.
+    생성값: (channel_id, convention, 두 컨벤션과 모두 일치하는 이름 예시)
+    """
+    pattern = compile_convention(candidate)
+    affixes = (pattern.literal_prefix(), pattern.literal_suffix())
+    for conv in existing_conventions:
+        if channel_id and conv.get('channel_id') == channel_id:
+            continue
+        convention = conv.get('convention', '')
+        if not convention or not affixes_compatible(affixes, source_affixes(convention)):
+            continue
+        example = find_common_name(pattern, convention)
+        if example is not None:
+            yield conv.get('channel_id', ''), convention, example
+
+
+def find_conflicts(candidate, existing_conventions, channel_id=None):
+    """
+    후보 컨벤션과 함께 일치하는 이름이 있는 다른 채널의 컨벤션을 찾습니다.
+    반환값: [(channel_id, convention, 두 컨벤션과 모두 일치하는 이름 예시), ...]
+    """
+    return list(iter_conflicts(candidate, existing_conventions, channel_id))
+
+
+def count_snapshot_matches(candidates):
+    """
+    멤버 스냅샷을 한 번만 읽어 각 후보 컨벤션과 일치하는 활성 멤버 수를 셉니다.
+    반환값: ({candidate: 일치하는 멤버 수}, 전체 활성 멤버 수). 스냅샷을 읽을 수 없으면 ({}, 0)
+    """
+    index = ConventionIndex((str(position), candidate) for position, candidate in enumerate(candidates))
+    counts = [0] * len(candidates)
+    total = 0
+
+    try:
+        for page in scan_member_records(get_snapshot_table()):
+            for record in page:
+                if not is_active_record(record):
+                    continue
+                total += 1
+                for position in index.match(record.get('user_name', '')):
+                    counts[int(position)] += 1
+    except Exception as e:
+        print(f"Error reading member snapshot: {str(e)}")
+        return {}, 0
+
+    return dict(zip(candidates, counts)), total
+
+
+def choose_convention(candidates, existing_conventions, channel_id=None, match_counts=None, total_members=0):
+    """
+    다른 채널 컨벤션과 겹치지 않고, 현재 멤버 대부분과 일치하는 너무 넓은 패턴이 아닌 첫 번째 후보를 고릅니다.
+    그런 후보가 없으면 첫 번째 후보를 충돌 목록과 함께 반환합니다.
+    반환값: (convention, conflicts)
+    """
+    match_counts = match_counts or {}
+    first_conflicts = None
+
+    for candidate in candidates:
+        conflicts = find_conflicts(candidate, existing_conventions, channel_id)
+        if first_conflicts is None:
+            first_conflicts = conflicts
+        if conflicts:
+            continue
+        if total_members and match_counts.get(candidate, 0) > total_members * RECOMMENDATION_MAX_MATCH_RATIO:
+            print(f"Candidate {candidate} matches {match_counts[candidate]}/{total_members} members, too broad")
+            continue
+        return candidate, []
+
+    return candidates[0], first_conflicts or []
+
+
+def find_local_recommendation(channel_name, existing_conventions, channel_id=None):
+    """채널 이름으로 만든 후보 중 다른 채널 컨벤션과 겹치지 않는 것이 있으면 반환하고, 없으면 None을 반환합니다."""
+    for candidate in local_candidates(channel_name):
+        # 충돌이 하나라도 있으면 더 찾지 않음
+        if next(iter_conflicts(candidate, existing_conventions, channel_id), None) is None:
+            return candidate
+    return None
@@ -0,0 +1,326 @@
+import os
+from convention_pattern import STAR, compile_convention, normalize_name, representative_chars, step_matches
+
+# 지연 생성되는 DFA 상태 수 상한 (초과하면 캐시를 비우고 다시 만듭니다)
+MAX_DFA_STATES = int(os.environ.get('CONVENTION_DFA_MAX_STATES', '4096'))
+
+
+def _is_literal(steps):
+    return all(step.__class__ is str for step in steps)
+
+
+class _TrieNode:
+    __slots__ = ('children', 'channels')
+
+    def __init__(self):
+        self.children = {}
+        self.channels = []
+
+
+class _GlobAutomaton:
+    """
+    여러 와일드카드 패턴을 하나로 합친 오토마톤입니다.
+    NFA 상태 집합을 필요할 때마다 DFA 상태로 변환하고 전이를 캐시하므로,
+    웜 컨테이너에서는 이름 길이에 비례하는 시간으로 매칭됩니다.
+    """
+
+    def __init__(self, patterns):
+        # patterns: [(channel_id, steps), ...]
+        self.patterns = patterns
+        self._reset()
+
+    def _reset(self):
+        self.state_ids = {}
+        self.states = []
+        self.accepts = []
+        self.transitions = {}
+        self.start = self._state_id(self._closure((k, 0) for k in range(len(self.patterns))))
+
+    def _closure(self, positions):
+        result = set()
+        stack = list(positions)
+        while stack:
+            item = stack.pop()
+            if item in result:
+                continue
+            result.add(item)
+            k, pos = item
+            steps = self.patterns[k][1]
+            # 와일드카드는 빈 문자열과도 매칭되므로 다음 단계로 건너뛸 수 있음
+            if pos < len(steps) and steps[pos] is STAR:
+                stack.append((k, pos + 1))
+        return frozenset(result)
+
+    def _state_id(self, state):
+        sid = self.state_ids.get(state)
+        if sid is None:
+            sid = len(self.states)
+            self.state_ids[state] = sid
+            self.states.append(state)
+            accepted = sorted(k for k, pos in state if pos == len(self.patterns[k][1]))
+            self.accepts.append(tuple(self.patterns[k][0] for k in accepted))
+        return sid
+
+    def _step(self, sid, char):
+        moved = []
+        for k, pos in self.states[sid]:
+            steps = self.patterns[k][1]
+            if pos < len(steps):
+                step = steps[pos]
+                if step is STAR:
+                    moved.append((k, pos))
+                elif step_matches(step, char):
+                    moved.append((k, pos + 1))
+        return self._state_id(self._closure(moved))
+
+    def match(self, user_name):
+        if len(self.states) > MAX_DFA_STATES:
+            self._reset()
+
+        sid = self.start
+        for char in user_name:
+            key = (sid, char)
+            next_sid = self.transitions.get(key)
+            if next_sid is None:
+                next_sid = self._step(sid, char)
+                self.transitions[key] = next_sid
+            sid = next_sid
+            # 더 이상 진행 가능한 패턴이 없으면 조기 종료
+            if not self.states[sid]:
+                return ()
+        return self.accepts[sid]
+
+
+class ConventionIndex:
+    """
+    채널 컨벤션을 한 번만 컴파일해 두고 사용자 이름과 매칭하는 인덱스입니다.
+    컨벤션은 문자열 또는 컴파일된 Pattern이며, `{a,b}` 대안은 펼친 패턴마다 아래 중 하나로 분류합니다.
+
+    - 와일드카드가 없는 컨벤션: 해시 맵으로 정확히 일치하는지 확인
+    - `접두사*` 형태의 컨벤션: 접두사 트라이로 확인
+    - `*접미사` 형태의 컨벤션: 뒤집은 접미사 트라이로 확인
+      (중간 와일드카드 패턴과 한 오토마톤에 합치면 DFA 상태 수가 급격히 늘어남)
+    - 그 외 컨벤션(`?`, 문자 집합, 대소문자 무시, 중간 와일드카드): 모든 패턴을 합친 하나의 오토마톤으로 확인
+    """
+
+    def __init__(self, conventions):
+        # conventions: [(channel_id, name_convention), ...]
+        self.exact = {}
+        self.prefix_root = _TrieNode()
+        self.suffix_root = _TrieNode()
+        self.automaton = None
+        self.size = 0
+        # 대안이 여러 개인 컨벤션은 한 이름에 여러 번 일치할 수 있으므로 결과에서 중복을 제거
+        self.has_alternatives = False
+
+        patterns = []
+        for channel_id, name_convention in conventions:
+            if not channel_id or not name_convention:
+                continue
+
+            self.size += 1
+            pattern = compile_convention(name_convention)
+            if len(pattern.alternatives) > 1:
+                self.has_alternatives = True
+
+            for steps in pattern.alternatives:
+                if _is_literal(steps):
+                    self.exact.setdefault(''.join(steps), []).append(channel_id)
+                elif steps[-1] is STAR and _is_literal(steps[:-1]):
+                    self._add_prefix(self.prefix_root, steps[:-1], channel_id)
+                elif steps[0] is STAR and _is_literal(steps[1:]):
+                    self._add_prefix(self.suffix_root, reversed(steps[1:]), channel_id)
+                else:
+                    patterns.append((channel_id, steps))
+
+        if patterns:
+            self.automaton = _GlobAutomaton(patterns)
+
+    def _add_prefix(self, root, prefix, channel_id):
+        node = root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.channels.append(channel_id)
+
+    def match(self, user_name):
+        """사용자 이름과 일치하는 컨벤션의 채널 ID 목록을 반환합니다."""
+        user_name = normalize_name(user_name)
+        matched = list(self.exact.get(user_name, ()))
+
+        # 이름을 따라 트라이를 내려가며 지나는 모든 접두사의 채널을 수집
+        _collect_prefixes(self.prefix_root, user_name, matched)
+        # 접미사는 이름을 뒤에서부터 읽으며 같은 방식으로 수집
+        if self.suffix_root.children:
+            _collect_prefixes(self.suffix_root, reversed(user_name), matched)
+
+        if self.automaton is not None:
+            matched.extend(self.automaton.match(user_name))
+
+        if self.has_alternatives:
+            return list(dict.fromkeys(matched))
+        return matched
+
+
+def _collect_prefixes(root, chars, matched):
+    node = root
+    matched.extend(node.channels)
+    for char in chars:
+        node = node.children.get(char)
+        if node is None:
+            break
+        matched.extend(node.channels)
+
+
+def _closure(pattern, positions):
+    """(대안 번호, 위치) 집합에서 와일드카드를 빈 문자열로 건너뛴 위치까지 포함한 집합을 반환합니다."""
+    result = set()
+    stack = list(positions)
+    while stack:
+        item = stack.pop()
+        if item in result:
+            continue
+        result.add(item)
+        k, pos = item
+        steps = pattern.alternatives[k]
+        if pos < len(steps) and steps[pos] is STAR:
+            stack.append((k, pos + 1))
+    return frozenset(result)
+
+
+def _start(pattern):
+    return _closure(pattern, [(k, 0) for k in range(len(pattern.alternatives))])
+
+
+def _advance(pattern, positions, char):
+    moved = []
+    for k, pos in positions:
+        steps = pattern.alternatives[k]
+        if pos < len(steps):
+            step = steps[pos]
+            if step is STAR:
+                moved.append((k, pos))
+            elif step_matches(step, char):
+                moved.append((k, pos + 1))
+    return _closure(pattern, moved)
+
+
+def _accepts(pattern, positions):
+    return any(pos == len(pattern.alternatives[k]) for k, pos in positions)
+
+
+def convention_includes(outer, inner):
+    """
+    inner 컨벤션과 일치하는 모든 이름이 outer 컨벤션과도 일치하는지 확인합니다.
+    예: convention_includes('2025_*', '2025_A*') -> True
+
+    두 패턴의 오토마톤을 곱한 상태 공간을 탐색하며, inner는 일치하지만 outer는
+    일치하지 않는 이름에 도달할 수 있는지 확인합니다. 모든 단계에서 똑같이 동작하는 문자는
+    하나의 대표 문자로 묶어 탐색합니다.
+    """
+    outer = compile_convention(outer)
+    inner = compile_convention(inner)
+    alphabet = representative_chars((outer, inner))
+
+    start = (_start(inner), _start(outer))
+    seen = {start}
+    stack = [start]
+    while stack:
+        inner_positions, outer_positions = stack.pop()
+
+        if _accepts(inner, inner_positions) and not _accepts(outer, outer_positions):
+            return False
+
+        for char in alphabet:
+            next_inner = _advance(inner, inner_positions, char)
+            if not next_inner:
+                continue
+            state = (next_inner, _advance(outer, outer_positions, char))
+            if state not in seen:
+                seen.add(state)
+                stack.append(state)
+
+    return True
+
+
+def _literal_affixes(pattern):
+    """
+    대안이 하나인 패턴에서 첫 리터럴이 아닌 단계 앞의 접두사와, 마지막 리터럴이 아닌 단계 뒤의 접미사를 반환합니다.
+    대안이 여러 개이면 None을 반환합니다.
+    """
+    if len(pattern.alternatives) != 1:
+        return None
+    steps = pattern.alternatives[0]
+    literal = [step.__class__ is str for step in steps]
+    if all(literal):
+        text = ''.join(steps)
+        return text, text
+    first = literal.index(False)
+    last = len(steps) - 1 - literal[::-1].index(False)
+    return ''.join(steps[:first]), ''.join(steps[last + 1:])
+
+
+def affixes_compatible(first, second):
+    """
+    두 컨벤션의 (리터럴 접두사, 리터럴 접미사)로 공통 이름이 있을 수 있는지 확인합니다.
+    한쪽 접두사가 다른 쪽 접두사로 시작하지 않거나 접미사끼리 어긋나면 겹치는 이름이 없습니다.
+    """
+    first_prefix, first_suffix = first
+    second_prefix, second_suffix = second
+    if not (first_prefix.startswith(second_prefix) or second_prefix.startswith(first_prefix)):
+        return False
+    return first_suffix.endswith(second_suffix) or second_suffix.endswith(first_suffix)
+
+
+def find_common_name(first, second):
+    """
+    두 컨벤션과 모두 일치하는 이름이 있으면 그 예시를 반환하고, 없으면 None을 반환합니다.
+    예: find_common_name('dev*', '*ops') -> 'devops', find_common_name('dev_*', 'ops_*') -> None
+
+    두 패턴의 오토마톤을 곱한 상태 공간을 너비 우선으로 탐색하여 가장 짧은 공통 이름을 찾습니다.
+    """
+    first = compile_convention(first)
+    second = compile_convention(second)
+
+    # 리터럴 접두사/접미사가 서로 어긋나면 탐색 없이 겹치지 않음
+    first_affixes, second_affixes = _literal_affixes(first), _literal_affixes(second)
+    if first_affixes and second_affixes and not affixes_compatible(first_affixes, second_affixes):
+        return None
+
+    alphabet = representative_chars((first, second))
+
+    start = (_start(first), _start(second))
+    parents = {start: None}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for state in frontier:
+            first_positions, second_positions = state
+            if _accepts(first, first_positions) and _accepts(second, second_positions):
+                name = []
+                while parents[state] is not None:
+                    state, char = parents[state]
+                    name.append(char)
+                return ''.join(reversed(name))
+
+            for char in alphabet:
+                next_first = _advance(first, first_positions, char)
+                if not next_first:
+                    continue
+                next_second = _advance(second, second_positions, char)
+                if not next_second:
+                    continue
+                next_state = (next_first, next_second)
+                if next_state not in parents:
+                    parents[next_state] = (state, char)
+                    next_frontier.append(next_state)
+        frontier = next_frontier
+
+    return None
+
+
+def conventions_overlap(first, second):
+    """두 컨벤션과 모두 일치하는 이름이 하나라도 있는지 확인합니다."""
+    return find_common_name(first, second) is not None
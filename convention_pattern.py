@@ -0,0 +1,418 @@
+import os
+import json
+import unicodedata
+
+# 사용자 이름과 컨벤션에 적용하는 유니코드 정규화 형식 (none이면 정규화하지 않음)
+# 한글 이름은 NFC(완성형)와 NFD(자모 분리형)로 들어올 수 있으므로 기본값은 NFC
+CONVENTION_NORMALIZATION = os.environ.get('CONVENTION_NORMALIZATION', 'NFC').upper()
+# 컨벤션 최대 길이와 중괄호 대안을 펼쳤을 때의 최대 패턴 수
+MAX_CONVENTION_LENGTH = 200
+MAX_ALTERNATIVES = 64
+
+# 저장된 컴파일 결과 형식 버전 (형식이 바뀌면 원문에서 다시 컴파일)
+COMPILED_FORMAT_VERSION = 1
+
+# 대소문자를 구분하지 않는 컨벤션의 접두어
+IGNORE_CASE_FLAG = '(?i)'
+# 원문에서 리터럴 접두사/접미사를 구할 때 멈추는 문자
+_SOURCE_SPECIAL_CHARS = frozenset('*?[]{}\\')
+
+
+class PatternError(ValueError):
+    """컨벤션 문법 오류입니다. 메시지는 사용자에게 그대로 보여줍니다."""
+
+
+class _Star:
+    """임의의 문자열(빈 문자열 포함)과 매칭되는 와일드카드 단계입니다."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return '*'
+
+
+class _Any:
+    """임의의 문자 하나와 매칭되는 단계입니다."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return '?'
+
+
+STAR = _Star()
+ANY = _Any()
+
+
+class CharClass:
+    """`[abc]`, `[a-z]`, `[!0-9]` 형태의 문자 집합 단계입니다."""
+    __slots__ = ('chars', 'ranges', 'negated')
+
+    def __init__(self, chars, ranges=(), negated=False):
+        self.chars = frozenset(chars)
+        self.ranges = tuple(sorted(set(ranges)))
+        self.negated = negated
+
+    def matches(self, char):
+        found = char in self.chars or any(low <= char <= high for low, high in self.ranges)
+        return found != self.negated
+
+    def _key(self):
+        return (self.chars, self.ranges, self.negated)
+
+    def __eq__(self, other):
+        return isinstance(other, CharClass) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        body = ''.join(sorted(self.chars)) + ''.join(f"{low}-{high}" for low, high in self.ranges)
+        return f"[{'!' if self.negated else ''}{body}]"
+
+
+def step_matches(step, char):
+    """STAR가 아닌 단계가 문자 하나와 일치하는지 확인합니다."""
+    if step.__class__ is str:
+        return step == char
+    if step is ANY:
+        return True
+    return step.matches(char)
+
+
+def normalize_name(name):
+    """사용자 이름/컨벤션을 CONVENTION_NORMALIZATION 형식으로 정규화합니다."""
+    if CONVENTION_NORMALIZATION == 'NONE' or unicodedata.is_normalized(CONVENTION_NORMALIZATION, name):
+        return name
+    return unicodedata.normalize(CONVENTION_NORMALIZATION, name)
+
+
+class Pattern:
+    """
+    컴파일된 컨벤션입니다.
+    alternatives는 중괄호 대안을 펼친 단계 튜플 목록이며, 각 단계는 리터럴 문자, STAR, ANY, CharClass 중 하나입니다.
+    """
+    __slots__ = ('source', 'alternatives', 'ignore_case')
+
+    def __init__(self, source, alternatives, ignore_case=False):
+        self.source = source
+        self.alternatives = tuple(alternatives)
+        self.ignore_case = ignore_case
+
+    def literal_prefix(self):
+        """모든 대안에 공통인, 첫 리터럴이 아닌 단계 앞의 리터럴 접두사를 반환합니다."""
+        prefixes = []
+        for steps in self.alternatives:
+            prefix = []
+            for step in steps:
+                if step.__class__ is not str:
+                    break
+                prefix.append(step)
+            prefixes.append(''.join(prefix))
+        return os.path.commonprefix(prefixes) if prefixes else ''
+
+    def literal_suffix(self):
+        """모든 대안에 공통인, 마지막 리터럴이 아닌 단계 뒤의 리터럴 접미사를 반환합니다."""
+        suffixes = []
+        for steps in self.alternatives:
+            suffix = []
+            for step in reversed(steps):
+                if step.__class__ is not str:
+                    break
+                suffix.append(step)
+            suffixes.append(''.join(suffix))
+        return os.path.commonprefix(suffixes)[::-1] if suffixes else ''
+
+    def to_json(self):
+        """DynamoDB에 저장할 컴파일 결과를 JSON 문자열로 반환합니다."""
+        return json.dumps({
+            'v': COMPILED_FORMAT_VERSION,
+            'source': self.source,
+            'ignore_case': self.ignore_case,
+            'alternatives': [_encode_steps(steps) for steps in self.alternatives]
+        }, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text):
+        """저장된 컴파일 결과를 읽습니다. 형식 버전이 다르면 None을 반환합니다."""
+        data = json.loads(text)
+        if data.get('v') != COMPILED_FORMAT_VERSION:
+            return None
+        return cls(
+            data['source'],
+            [_decode_steps(tokens) for tokens in data['alternatives']],
+            data.get('ignore_case', False)
+        )
+
+    def __repr__(self):
+        return f"Pattern({self.source!r})"
+
+
+def _encode_steps(steps):
+    tokens = []
+    for step in steps:
+        if step.__class__ is str:
+            # 연속된 리터럴은 하나의 문자열로 저장
+            if tokens and isinstance(tokens[-1], str):
+                tokens[-1] += step
+            else:
+                tokens.append(step)
+        elif step is STAR:
+            tokens.append(['*'])
+        elif step is ANY:
+            tokens.append(['?'])
+        else:
+            tokens.append(['[', int(step.negated), ''.join(sorted(step.chars)), [list(pair) for pair in step.ranges]])
+    return tokens
+
+
+def _decode_steps(tokens):
+    steps = []
+    for token in tokens:
+        if isinstance(token, str):
+            steps.extend(token)
+        elif token[0] == '*':
+            steps.append(STAR)
+        elif token[0] == '?':
+            steps.append(ANY)
+        else:
+            steps.append(CharClass(token[2], [tuple(pair) for pair in token[3]], bool(token[1])))
+    return tuple(steps)
+
+
+class _Parser:
+    """
+    컨벤션 문법을 파싱합니다.
+    `*` 임의의 문자열, `?` 임의의 문자 하나, `[abc]`/`[a-z]`/`[!abc]` 문자 집합,
+    `{a,b}` 대안(중첩 가능), `\\` 다음 문자는 리터럴로 취급합니다.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        raise PatternError(f"{message} (위치 {self.pos + 1})")
+
+    def parse(self):
+        alternatives = self.sequence(in_brace=False)
+        if self.pos < len(self.text):
+            self.error("짝이 맞지 않는 `}`")
+        return alternatives
+
+    def sequence(self, in_brace):
+        """`,` 또는 `}` 전까지 읽고 펼친 대안 목록을 반환합니다."""
+        alternatives = [()]
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if in_brace and char in ',}':
+                break
+            if char == '}':
+                break
+
+            if char == '\\':
+                if self.pos + 1 >= len(text):
+                    self.error("`\\` 뒤에 문자가 없습니다")
+                step = text[self.pos + 1]
+                self.pos += 2
+            elif char == '*':
+                step = STAR
+                self.pos += 1
+            elif char == '?':
+                step = ANY
+                self.pos += 1
+            elif char == '[':
+                step = self.char_class()
+            elif char == '{':
+                options = self.brace()
+                alternatives = [prefix + option for prefix in alternatives for option in options]
+                if len(alternatives) > MAX_ALTERNATIVES:
+                    self.error(f"`{{}}` 대안이 너무 많습니다 (최대 {MAX_ALTERNATIVES}개)")
+                continue
+            elif char == ']':
+                self.error("짝이 맞지 않는 `]`")
+            else:
+                step = char
+                self.pos += 1
+
+            alternatives = [prefix + (step,) for prefix in alternatives]
+        return alternatives
+
+    def brace(self):
+        start = self.pos
+        self.pos += 1
+        options = []
+        while True:
+            options.extend(self.sequence(in_brace=True))
+            if self.pos >= len(self.text):
+                self.pos = start
+                self.error("닫히지 않은 `{`")
+            if self.text[self.pos] == '}':
+                self.pos += 1
+                return options
+            self.pos += 1  # ','
+
+    def char_class(self):
+        start = self.pos
+        self.pos += 1
+        text = self.text
+        negated = self.pos < len(text) and text[self.pos] in '!^'
+        if negated:
+            self.pos += 1
+
+        chars, ranges = set(), []
+        first = True
+        while True:
+            if self.pos >= len(text):
+                self.pos = start
+                self.error("닫히지 않은 `[`")
+            char = text[self.pos]
+            if char == ']' and not first:
+                self.pos += 1
+                break
+            if char == '\\' and self.pos + 1 < len(text):
+                self.pos += 1
+                char = text[self.pos]
+            self.pos += 1
+            first = False
+
+            if self.pos + 1 < len(text) and text[self.pos] == '-' and text[self.pos + 1] != ']':
+                high = text[self.pos + 1]
+                if high == '\\' and self.pos + 2 < len(text):
+                    high = text[self.pos + 2]
+                    self.pos += 1
+                if high < char:
+                    self.error(f"잘못된 문자 범위 `{char}-{high}`")
+                ranges.append((char, high))
+                self.pos += 2
+            else:
+                chars.add(char)
+
+        return CharClass(chars, ranges, negated)
+
+
+def _case_variants(char):
+    variants = {char, char.lower(), char.upper(), char.casefold()}
+    return {variant for variant in variants if len(variant) == 1}
+
+
+def _ignore_case_step(step):
+    """대소문자를 구분하지 않도록 단계를 문자 집합으로 바꿉니다."""
+    if step.__class__ is str:
+        variants = _case_variants(step)
+        return step if len(variants) == 1 else CharClass(variants)
+    if isinstance(step, CharClass):
+        chars = set()
+        for char in step.chars:
+            chars |= _case_variants(char)
+        ranges = set(step.ranges)
+        for low, high in step.ranges:
+            for convert in (str.lower, str.upper):
+                mapped_low, mapped_high = convert(low), convert(high)
+                if len(mapped_low) == 1 and len(mapped_high) == 1 and mapped_low <= mapped_high:
+                    ranges.add((mapped_low, mapped_high))
+        return CharClass(chars, ranges, step.negated)
+    return step
+
+
+def _collapse_stars(steps):
+    collapsed = []
+    for step in steps:
+        if step is STAR and collapsed and collapsed[-1] is STAR:
+            continue
+        collapsed.append(step)
+    return tuple(collapsed)
+
+
+def parse_convention(name_convention):
+    """
+    컨벤션 문자열을 Pattern으로 컴파일합니다. 문법이 잘못되었으면 PatternError를 발생시킵니다.
+    `(?i)`로 시작하면 대소문자를 구분하지 않습니다. 예: `(?i)dev*`, `2025_{A,B}반_*`, `[0-9][0-9]학번_*`
+    """
+    source = normalize_name(name_convention)
+    if len(source) > MAX_CONVENTION_LENGTH:
+        raise PatternError(f"컨벤션이 너무 깁니다 (최대 {MAX_CONVENTION_LENGTH}자)")
+
+    ignore_case = source.startswith(IGNORE_CASE_FLAG)
+    body = source[len(IGNORE_CASE_FLAG):] if ignore_case else source
+    if not body:
+        raise PatternError("컨벤션이 비어 있습니다")
+
+    alternatives = []
+    for steps in _Parser(body).parse():
+        if ignore_case:
+            steps = tuple(_ignore_case_step(step) for step in steps)
+        steps = _collapse_stars(steps)
+        if steps not in alternatives:
+            alternatives.append(steps)
+    return Pattern(source, alternatives, ignore_case)
+
+
+def compile_convention(name_convention):
+    """
+    컨벤션을 Pattern으로 컴파일합니다. 이미 컴파일된 Pattern은 그대로 반환합니다.
+    문법 검사 전에 저장된 컨벤션이 잘못된 문법이면 `*`만 와일드카드로 보는 이전 방식으로 컴파일합니다.
+    """
+    if isinstance(name_convention, Pattern):
+        return name_convention
+    try:
+        return parse_convention(name_convention)
+    except PatternError:
+        source = normalize_name(name_convention)
+        steps = tuple(STAR if char == '*' else char for char in source)
+        return Pattern(source, [_collapse_stars(steps)])
+
+
+def source_affixes(name_convention):
+    """
+    컨벤션을 컴파일하지 않고 원문에서 리터럴 접두사와 접미사를 구합니다.
+    특수 문자(`*`, `?`, `[`, `]`, `{`, `}`, `\\`)에서 멈추므로 실제 접두사/접미사보다 짧을 수는 있어도
+    틀리지는 않습니다. 대소문자를 구분하지 않는 컨벤션은 ('', '')를 반환합니다.
+    """
+    source = normalize_name(name_convention)
+    if source.startswith(IGNORE_CASE_FLAG):
+        return '', ''
+
+    prefix_end = 0
+    while prefix_end < len(source) and source[prefix_end] not in _SOURCE_SPECIAL_CHARS:
+        prefix_end += 1
+    if prefix_end == len(source):
+        return source, source
+    suffix_start = len(source)
+    while suffix_start > prefix_end and source[suffix_start - 1] not in _SOURCE_SPECIAL_CHARS:
+        suffix_start -= 1
+    return source[:prefix_end], source[suffix_start:]
+
+
+# 예시 이름을 만들 때 우선 사용하는 문자
+_READABLE_CHARS = 'xyz0123456789abcdefghijklmnopqrstuvw'
+
+
+def representative_chars(patterns):
+    """
+    패턴들이 구분하는 문자 부류마다 대표 문자 하나씩을 반환합니다.
+    두 문자가 모든 단계에서 똑같이 일치/불일치하면 같은 부류이므로, 패턴 비교(포함/겹침)에서는
+    부류별 대표 문자만 확인하면 됩니다.
+    """
+    steps = set()
+    for pattern in patterns:
+        for alternative in pattern.alternatives:
+            steps.update(step for step in alternative if step is not STAR and step is not ANY)
+    steps = list(steps)
+
+    # 단계의 경계가 되는 코드 포인트마다 후보를 만들고 일치 여부가 같은 후보는 하나로 합침
+    points = {0}
+    for step in steps:
+        if step.__class__ is str:
+            points.update((ord(step), ord(step) + 1))
+        else:
+            for char in step.chars:
+                points.update((ord(char), ord(char) + 1))
+            for low, high in step.ranges:
+                points.update((ord(low), ord(high) + 1))
+
+    candidates = list(_READABLE_CHARS) + [chr(point) for point in sorted(points) if point < 0x110000]
+    representatives = {}
+    for char in candidates:
+        signature = tuple(step_matches(step, char) for step in steps)
+        representatives.setdefault(signature, char)
+    return list(representatives.values())
@@ -0,0 +1,153 @@
+import os
+import heapq
+from convention_pattern import IGNORE_CASE_FLAG, compile_convention
+
+# 프롬프트에 그대로 넣는 기존 컨벤션 수 (채널 이름과 가장 비슷한 순)
+PROMPT_TOP_K = int(os.environ.get('PROMPT_TOP_K', '20'))
+# 나머지 컨벤션을 요약할 때 보여주는 패턴 계열 수
+PROMPT_FAMILY_LIMIT = int(os.environ.get('PROMPT_FAMILY_LIMIT', '10'))
+# 프롬프트에 넣는 컨벤션 한 줄의 최대 길이
+PROMPT_MAX_CONVENTION_LENGTH = 80
+
+# 리터럴 접두사를 구한 컨벤션을 기억하는 최대 수 (넘으면 비우고 다시 채움)
+ANALYZED_CONVENTION_CACHE_SIZE = 50000
+
+# 웜 컨테이너에서 재사용하는 컨벤션 분석 결과 {convention: (prefix, text, is_literal)}
+_analyzed_conventions = {}
+
+# 이름을 토큰으로 나누는 구분 문자
+_SEPARATORS = '_-. */'
+_SEPARATOR_TABLE = str.maketrans({char: ' ' for char in _SEPARATORS})
+
+
+def tokenize(text):
+    """이름을 소문자 토큰 집합으로 나눕니다. 예: '2025_인하대_캡스톤_*' -> {'2025', '인하대', '캡스톤'}"""
+    return set(text.lower().translate(_SEPARATOR_TABLE).split())
+
+
+def _literal_prefix(pattern):
+    """
+    컴파일된 컨벤션의 리터럴 접두사를 반환합니다 (`?`, `[..]`, `{a,b}` 문법 반영, 대안이 여러 개이면 공통 접두사).
+    대소문자를 구분하지 않는 컨벤션은 글자가 문자 집합으로 바뀌므로 플래그를 뺀 원문으로 구합니다.
+    """
+    if pattern.ignore_case:
+        return compile_convention(pattern.source[len(IGNORE_CASE_FLAG):]).literal_prefix()
+    return pattern.literal_prefix()
+
+
+def analyze_convention(convention):
+    """
+    컨벤션의 (리터럴 접두사, 플래그를 뺀 원문, 와일드카드가 없는지 여부)를 반환합니다.
+    컴파일 결과는 웜 컨테이너에서 재사용합니다 (유사도와 계열 요약이 같은 컨벤션을 다시 컴파일하지 않음).
+    """
+    analyzed = _analyzed_conventions.get(convention)
+    if analyzed is None:
+        pattern = compile_convention(convention)
+        prefix = _literal_prefix(pattern)
+        text = pattern.source[len(IGNORE_CASE_FLAG):] if pattern.ignore_case else convention
+        is_literal = len(pattern.alternatives) == 1 and len(prefix) == len(pattern.alternatives[0])
+        analyzed = (prefix, text, is_literal)
+
+        if len(_analyzed_conventions) >= ANALYZED_CONVENTION_CACHE_SIZE:
+            _analyzed_conventions.clear()
+        _analyzed_conventions[convention] = analyzed
+    return analyzed
+
+
+def _common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def similarity(channel_name, convention):
+    """
+    채널 이름과 컨벤션의 유사도를 반환합니다.
+    리터럴 접두사가 채널 이름과 겹치는 길이와 공통 토큰 비율(Jaccard)을 함께 사용합니다.
+    """
+    name = channel_name.lower()
+    prefix, text, _ = analyze_convention(convention)
+    prefix = prefix.lower()
+
+    prefix_score = _common_prefix_length(name, prefix) / max(len(name), 1)
+
+    name_tokens = tokenize(channel_name)
+    convention_tokens = tokenize(text)
+    union = name_tokens | convention_tokens
+    token_score = len(name_tokens & convention_tokens) / len(union) if union else 0.0
+
+    return prefix_score + token_score
+
+
+def pattern_family(convention):
+    """
+    컨벤션이 속한 패턴 계열을 반환합니다. 리터럴 접두사의 첫 토큰과 구분 문자를 남기고 나머지는 *로 줄입니다.
+    예: '2025_인하대_캡스톤_*' -> '2025_*', 'dev*' -> 'dev*', '2025_{A,B}반_*' -> '2025_*', '[0-9]학번_*' -> '*'
+    """
+    prefix, _, is_literal = analyze_convention(convention)
+    for index, char in enumerate(prefix):
+        # 리터럴 접두사의 `*`는 이스케이프된 문자이므로 구분 문자로 보지 않음
+        if char in _SEPARATORS and char != '*':
+            return prefix[:index + 1] + '*'
+
+    # 와일드카드가 없고 구분 문자도 없는 컨벤션은 그대로 하나의 계열
+    if is_literal:
+        return prefix
+    return prefix + '*'
+
+
+def select_relevant_conventions(channel_name, conventions, top_k=PROMPT_TOP_K):
+    """
+    채널 이름과 가장 비슷한(충돌 가능성이 높은) 컨벤션 top_k개와 나머지 컨벤션을 나누어 반환합니다.
+    conventions: [{'channel_id': ..., 'convention': ...}, ...]
+    """
+    scored = [
+        (similarity(channel_name, conv.get('convention', '')), position, conv)
+        for position, conv in enumerate(conventions)
+    ]
+    selected = heapq.nlargest(top_k, scored, key=lambda entry: (entry[0], -entry[1]))
+    selected_positions = {position for _, position, _ in selected}
+
+    relevant = [conv for _, _, conv in selected]
+    rest = [conv for position, conv in enumerate(conventions) if position not in selected_positions]
+    return relevant, rest
+
+
+def summarize_pattern_families(conventions, limit=PROMPT_FAMILY_LIMIT):
+    """나머지 컨벤션을 패턴 계열별 개수로 요약합니다. 개수가 많은 계열부터 limit개를 보여줍니다."""
+    counts = {}
+    for conv in conventions:
+        family = pattern_family(conv.get('convention', ''))
+        counts[family] = counts.get(family, 0) + 1
+
+    top_families = heapq.nlargest(limit, counts.items(), key=lambda entry: (entry[1], entry[0]))
+    lines = [f"- {_truncate(family)} 형식: {count}개" for family, count in top_families]
+
+    remaining = len(counts) - len(top_families)
+    if remaining > 0:
+        remaining_count = sum(counts.values()) - sum(count for _, count in top_families)
+        lines.append(f"- 그 외 {remaining}개 계열: {remaining_count}개")
+    return lines
+
+
+def format_convention_line(conv):
+    """프롬프트에 넣을 컨벤션 한 줄을 만듭니다."""
+    return f"- 채널 ID: {conv.get('channel_id', '')}, 컨벤션: {_truncate(conv.get('convention', ''))}"
+
+
+def _truncate(text):
+    if len(text) <= PROMPT_MAX_CONVENTION_LENGTH:
+        return text
+    return text[:PROMPT_MAX_CONVENTION_LENGTH] + '…'
+
+
+def estimate_token_count(text):
+    """
+    프롬프트 토큰 수를 추정합니다.
+    영문/숫자는 약 4자에 1토큰, 한글 등 그 외 문자는 1자에 약 1토큰으로 계산합니다.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
@@ -0,0 +1,440 @@
+import os
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from convention_index import ConventionIndex
+from convention_pattern import Pattern, compile_convention, normalize_name
+from aws_clients import get_dynamodb_table
+from tracing import trace
+
+# 환경 변수
+DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE', 'slack-invitor')
+# 캐시된 컨벤션을 버전과 관계없이 다시 읽어오는 주기 (초)
+CONVENTION_CACHE_TTL = int(os.environ.get('CONVENTION_CACHE_TTL', '300'))
+# 컨벤션 테이블 병렬 스캔 세그먼트 수
+CONVENTION_SCAN_SEGMENTS = int(os.environ.get('CONVENTION_SCAN_SEGMENTS', '4'))
+# prefix_bucket 속성의 보조 인덱스(GSI) 이름. 설정하면 이벤트 처리에서 전체 스캔 대신 Query로 컨벤션을 찾음
+CONVENTION_PREFIX_INDEX = os.environ.get('CONVENTION_PREFIX_INDEX')
+# prefix_bucket에 저장하는 리터럴 접두사 길이 (바꾸면 기존 항목의 prefix_bucket을 다시 채워야 함)
+CONVENTION_PREFIX_LENGTH = int(os.environ.get('CONVENTION_PREFIX_LENGTH', '3'))
+
+# 컨벤션 매칭에 필요한 속성만 읽어오기 위한 프로젝션
+CONVENTION_ATTRIBUTES = ('channel_id', 'name_convention', 'compiled_convention')
+
+# 컨벤션 변경 버전을 저장하는 메타 항목의 파티션 키 (채널 ID와 겹치지 않음)
+VERSION_KEY = '#version'
+
+# `*`로 시작하는 컨벤션의 prefix_bucket (이름의 접두사가 아니므로 항상 함께 조회)
+WILDCARD_BUCKET = '*'
+
+# 웜 컨테이너에서 재사용하는 컨벤션 캐시
+_cache = {
+    'version': None,
+    'loaded_at': 0.0,
+    'conventions': None,
+    'index': None
+}
+_cache_stats = {
+    'hits': 0,
+    'misses': 0
+}
+
+# 웜 컨테이너에서 재사용하는 prefix_bucket별 매칭 인덱스 (컨벤션 버전이 바뀌면 비움)
+_bucket_cache = {
+    'version': None,
+    'loaded_at': 0.0,
+    'indexes': {}
+}
+
+# 스캔 결과 변환기 (boto3를 처음 스캔할 때 가져옴)
+_deserializer = None
+
+# 병렬 스캔 세그먼트가 끝났음을 알리는 표시
+_SEGMENT_DONE = object()
+
+def get_table():
+    """컨벤션 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(DYNAMODB_TABLE)
+
+def is_convention_item(item):
+    """메타 항목을 제외한 실제 채널 컨벤션 항목인지 확인합니다."""
+    return item.get('channel_id') != VERSION_KEY and bool(item.get('name_convention'))
+
+def load_pattern(item):
+    """
+    컨벤션 항목의 매칭 패턴을 반환합니다.
+    저장할 때 컴파일해 둔 compiled_convention이 있으면 다시 파싱하지 않고 사용하고,
+    없거나 형식 버전이 다르면 name_convention 원문을 반환합니다 (ConventionIndex에서 컴파일).
+    """
+    compiled = item.get('compiled_convention')
+    if compiled:
+        try:
+            pattern = Pattern.from_json(compiled)
+            if pattern is not None:
+                return pattern
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Invalid compiled convention for {item.get('channel_id')}: {str(e)}")
+    return item.get('name_convention', '')
+
+def _get_deserializer():
+    global _deserializer
+    if _deserializer is None:
+        from boto3.dynamodb.types import TypeDeserializer
+        _deserializer = TypeDeserializer()
+    return _deserializer
+
+def _scan_segment(client, request, segment=None, total_segments=None):
+    """하나의 스캔 세그먼트를 LastEvaluatedKey를 따라가며 페이지 단위로 읽어옵니다."""
+    deserializer = _get_deserializer()
+    request = dict(request)
+    if total_segments:
+        request['Segment'] = segment
+        request['TotalSegments'] = total_segments
+
+    while True:
+        with trace('dynamodb.scan'):
+            response = client.scan(**request)
+        yield [
+            {key: deserializer.deserialize(value) for key, value in item.items()}
+            for item in response.get('Items', [])
+        ]
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def _scan_request(table, attributes=None):
+    """스캔 요청의 공통 인자를 만듭니다. attributes를 지정하면 해당 속성만 읽어옵니다."""
+    request = {'TableName': table.name}
+    if attributes:
+        names = {f'#a{i}': attribute for i, attribute in enumerate(attributes)}
+        request['ProjectionExpression'] = ', '.join(names)
+        request['ExpressionAttributeNames'] = names
+    return request
+
+def scan_page(table, attributes=None, start_key=None):
+    """
+    테이블을 한 페이지만 스캔하여 (항목 리스트, 다음 시작 키)를 반환합니다.
+    다음 시작 키는 저수준 형식의 LastEvaluatedKey이며, 마지막 페이지이면 None입니다.
+    """
+    deserializer = _get_deserializer()
+    request = _scan_request(table, attributes)
+    if start_key:
+        request['ExclusiveStartKey'] = start_key
+    
+    with trace('dynamodb.scan'):
+        response = table.meta.client.scan(**request)
+    items = [
+        {key: deserializer.deserialize(value) for key, value in item.items()}
+        for item in response.get('Items', [])
+    ]
+    return items, response.get('LastEvaluatedKey')
+
+def scan_pages(table, attributes=None, total_segments=1):
+    """
+    테이블 전체를 스캔하여 페이지(항목 리스트)를 하나씩 생성하는 제너레이터입니다.
+    total_segments가 2 이상이면 DynamoDB 병렬 스캔(Segment/TotalSegments)을
+    스레드 풀에서 실행하고, 완료되는 순서대로 페이지를 전달합니다.
+    attributes를 지정하면 해당 속성만 읽어옵니다.
+    """
+    # 리소스 객체는 스레드 간 공유가 안전하지 않으므로 하위 클라이언트를 사용
+    client = table.meta.client
+    request = _scan_request(table, attributes)
+
+    if total_segments <= 1:
+        yield from _scan_segment(client, request)
+        return
+
+    pages = queue.Queue()
+
+    def scan_worker(segment):
+        try:
+            for page in _scan_segment(client, request, segment, total_segments):
+                pages.put(page)
+            pages.put(_SEGMENT_DONE)
+        except Exception as e:
+            pages.put(e)
+
+    executor = ThreadPoolExecutor(max_workers=total_segments)
+    try:
+        for segment in range(total_segments):
+            executor.submit(scan_worker, segment)
+
+        remaining = total_segments
+        while remaining:
+            page = pages.get()
+            if page is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield page
+    finally:
+        executor.shutdown(wait=False)
+
+def scan_conventions(table, total_segments=None):
+    """채널 컨벤션 항목(channel_id, name_convention)만 하나씩 생성하는 제너레이터입니다."""
+    if total_segments is None:
+        total_segments = CONVENTION_SCAN_SEGMENTS
+
+    for page in scan_pages(table, CONVENTION_ATTRIBUTES, total_segments):
+        for item in page:
+            if is_convention_item(item):
+                yield item
+
+def get_convention_version(table):
+    """버전 메타 항목을 조회하여 현재 컨벤션 버전을 반환합니다."""
+    response = table.get_item(
+        Key={
+            'channel_id': VERSION_KEY
+        },
+        ProjectionExpression='convention_version'
+    )
+    return int(response.get('Item', {}).get('convention_version', 0))
+
+def bump_convention_version(table):
+    """
+    컨벤션이 추가/변경/삭제될 때마다 호출하여 버전을 1 증가시킵니다.
+    웜 컨테이너의 캐시는 이 버전이 바뀐 것을 보고 컨벤션을 다시 읽어옵니다.
+    """
+    try:
+        response = table.update_item(
+            Key={
+                'channel_id': VERSION_KEY
+            },
+            UpdateExpression='ADD convention_version :one',
+            ExpressionAttributeValues={
+                ':one': 1
+            },
+            ReturnValues='UPDATED_NEW'
+        )
+        version = int(response['Attributes']['convention_version'])
+        print(f"Convention version bumped to {version}")
+        return version
+    except Exception as e:
+        print(f"Error bumping convention version: {str(e)}")
+        return None
+
+def get_cached_conventions(table):
+    """
+    캐시된 컨벤션 목록과 매칭 인덱스를 반환합니다.
+    버전 메타 항목이 바뀌었거나 TTL이 지난 경우에만 테이블을 다시 스캔합니다.
+    """
+    version = get_convention_version(table)
+    now = time.time()
+
+    is_fresh = (
+        _cache['index'] is not None
+        and _cache['version'] == version
+        and now - _cache['loaded_at'] < CONVENTION_CACHE_TTL
+    )
+
+    if is_fresh:
+        _cache_stats['hits'] += 1
+    else:
+        _cache_stats['misses'] += 1
+
+        conventions = list(scan_conventions(table))
+
+        _cache['conventions'] = conventions
+        _cache['index'] = ConventionIndex(
+            (item.get('channel_id'), load_pattern(item)) for item in conventions
+        )
+        _cache['version'] = version
+        _cache['loaded_at'] = now
+
+    print(
+        f"Convention cache {'hit' if is_fresh else 'miss'} "
+        f"(version: {version}, conventions: {_cache['index'].size}, "
+        f"hits: {_cache_stats['hits']}, misses: {_cache_stats['misses']})"
+    )
+
+    return _cache['conventions'], _cache['index']
+
+def get_convention_index(table):
+    """캐시된 컨벤션 매칭 인덱스를 반환합니다."""
+    return get_cached_conventions(table)[1]
+
+def prefix_bucket(name_convention):
+    """
+    컨벤션의 prefix_bucket 값을 반환합니다.
+    첫 와일드카드/문자 집합 앞의 리터럴 접두사(중괄호 대안은 공통 접두사)를 CONVENTION_PREFIX_LENGTH 길이로 자르고,
+    리터럴 접두사가 없으면 (`*`로 시작, 대소문자 무시 등) WILDCARD_BUCKET을 반환합니다.
+    """
+    prefix = compile_convention(name_convention).literal_prefix()
+    return prefix[:CONVENTION_PREFIX_LENGTH] or WILDCARD_BUCKET
+
+def name_buckets(user_name):
+    """
+    사용자 이름과 일치할 수 있는 컨벤션의 prefix_bucket 목록을 반환합니다.
+    접두사가 CONVENTION_PREFIX_LENGTH보다 짧은 컨벤션도 있으므로 길이 1부터 모든 접두사를 포함합니다.
+    """
+    user_name = normalize_name(user_name)
+    buckets = [user_name[:length] for length in range(1, min(len(user_name), CONVENTION_PREFIX_LENGTH) + 1)]
+    # '*'로 시작하는 이름은 길이 1 접두사가 와일드카드 버킷과 같으므로 중복 조회하지 않음
+    if WILDCARD_BUCKET not in buckets:
+        buckets.append(WILDCARD_BUCKET)
+    return buckets
+
+def query_bucket(table, bucket):
+    """보조 인덱스에서 prefix_bucket이 같은 컨벤션 항목을 모두 조회합니다."""
+    request = {
+        'IndexName': CONVENTION_PREFIX_INDEX,
+        'KeyConditionExpression': 'prefix_bucket = :bucket',
+        'ExpressionAttributeValues': {
+            ':bucket': bucket
+        },
+        'ProjectionExpression': ', '.join(CONVENTION_ATTRIBUTES)
+    }
+
+    items = []
+    while True:
+        response = table.query(**request)
+        items.extend(item for item in response.get('Items', []) if is_convention_item(item))
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+def get_bucket_index(table, bucket):
+    """prefix_bucket 하나의 컨벤션 매칭 인덱스를 반환합니다. 캐시에 없으면 Query로 읽어옵니다."""
+    index = _bucket_cache['indexes'].get(bucket)
+    if index is None:
+        index = ConventionIndex(
+            (item.get('channel_id'), load_pattern(item)) for item in query_bucket(table, bucket)
+        )
+        _bucket_cache['indexes'][bucket] = index
+    return index
+
+def match_conventions(table, user_name):
+    """
+    사용자 이름과 일치하는 컨벤션의 채널 ID 목록을 반환합니다.
+    CONVENTION_PREFIX_INDEX가 설정되어 있으면 이름의 접두사 버킷과 WILDCARD_BUCKET만 Query로 읽어오므로,
+    채널 수가 늘어나도 이벤트 하나의 읽기 비용이 일정합니다. 읽어온 버킷은 컨벤션 버전이 바뀔 때까지 재사용합니다.
+    설정되어 있지 않으면 전체 컨벤션 캐시(get_convention_index)를 사용합니다.
+    """
+    if not CONVENTION_PREFIX_INDEX:
+        return get_convention_index(table).match(user_name)
+
+    version = get_convention_version(table)
+    now = time.time()
+    if _bucket_cache['version'] != version or now - _bucket_cache['loaded_at'] >= CONVENTION_CACHE_TTL:
+        _bucket_cache['version'] = version
+        _bucket_cache['loaded_at'] = now
+        _bucket_cache['indexes'] = {}
+
+    matched = []
+    for bucket in name_buckets(user_name):
+        matched.extend(get_bucket_index(table, bucket).match(user_name))
+    return matched
+
+def backfill_prefix_buckets(table):
+    """
+    prefix_bucket이 없거나 현재 CONVENTION_PREFIX_LENGTH와 맞지 않는 기존 컨벤션 항목을 갱신합니다.
+    compiled_convention이 없거나 형식 버전이 다른 항목도 함께 다시 컴파일하여 저장합니다.
+    보조 인덱스를 처음 만들었거나 접두사 길이를 바꾼 뒤 한 번 실행합니다. 갱신한 항목 수를 반환합니다.
+    """
+    updated = 0
+    attributes = ('channel_id', 'name_convention', 'prefix_bucket', 'compiled_convention')
+    for page in scan_pages(table, attributes, CONVENTION_SCAN_SEGMENTS):
+        for item in page:
+            if not is_convention_item(item):
+                continue
+            bucket = prefix_bucket(item['name_convention'])
+            if item.get('prefix_bucket') == bucket and isinstance(load_pattern(item), Pattern):
+                continue
+
+            table.update_item(
+                Key={
+                    'channel_id': item['channel_id']
+                },
+                UpdateExpression='SET prefix_bucket = :bucket, compiled_convention = :compiled',
+                ExpressionAttributeValues={
+                    ':bucket': bucket,
+                    ':compiled': compile_convention(item['name_convention']).to_json()
+                }
+            )
+            updated += 1
+
+    if updated:
+        bump_convention_version(table)
+    print(f"Prefix buckets backfilled: {updated} conventions updated")
+    return updated
+
+def convention_item(channel_id, pattern, current_datetime, previous=None):
+    """
+    컨벤션 테이블에 저장할 채널 항목을 만듭니다. pattern은 parse_convention으로 검사한 Pattern입니다.
+    previous(기존 항목)가 있으면 생성 시각을 유지하고 변경 전 컨벤션을 previous_convention에 남깁니다.
+    """
+    item = {
+        'channel_id': channel_id,
+        'name_convention': pattern.source,
+        'compiled_convention': pattern.to_json(),
+        'prefix_bucket': prefix_bucket(pattern),
+        'created_date': current_datetime
+    }
+    if previous:
+        item['created_date'] = previous.get('created_date') or current_datetime
+        item['previous_convention'] = previous.get('name_convention', '')
+        item['updated_date'] = current_datetime
+    return item
+
+def export_conventions(table):
+    """채널 컨벤션을 {channel_id: name_convention} 형태로 모두 읽어옵니다 (채널 ID 순)."""
+    conventions = {
+        item['channel_id']: item['name_convention']
+        for item in scan_conventions(table)
+    }
+    return dict(sorted(conventions.items()))
+
+def import_conventions(table, patterns, current_datetime, dry_run=False):
+    """
+    여러 채널의 컨벤션을 한 번에 저장합니다. patterns는 {channel_id: Pattern 또는 None(삭제)} 입니다.
+    기존 항목은 테이블을 한 번 스캔하여 확인하고, 바뀐 항목만 batch_writer로 묶어 쓴 뒤(요청당 25개)
+    컨벤션 버전은 한 번만 올립니다. dry_run이면 쓰지 않고 변경 내용만 계산합니다.
+
+    반환값: {'created': {channel_id: 컨벤션}, 'updated': {channel_id: (변경 전, 변경 후)},
+             'deleted': {channel_id: 변경 전}, 'unchanged': [channel_id, ...]}
+    """
+    existing = {}
+    for page in scan_pages(table, ('channel_id', 'name_convention', 'created_date'), CONVENTION_SCAN_SEGMENTS):
+        for item in page:
+            if is_convention_item(item) and item['channel_id'] in patterns:
+                existing[item['channel_id']] = item
+
+    changes = {'created': {}, 'updated': {}, 'deleted': {}, 'unchanged': []}
+    writes = []
+    for channel_id, pattern in patterns.items():
+        previous = existing.get(channel_id)
+        if pattern is None:
+            if previous:
+                changes['deleted'][channel_id] = previous['name_convention']
+                writes.append((channel_id, None))
+            else:
+                changes['unchanged'].append(channel_id)
+        elif previous is None:
+            changes['created'][channel_id] = pattern.source
+            writes.append((channel_id, convention_item(channel_id, pattern, current_datetime)))
+        elif previous['name_convention'] == pattern.source:
+            changes['unchanged'].append(channel_id)
+        else:
+            changes['updated'][channel_id] = (previous['name_convention'], pattern.source)
+            writes.append((channel_id, convention_item(channel_id, pattern, current_datetime, previous)))
+
+    if dry_run or not writes:
+        return changes
+
+    with table.batch_writer() as batch:
+        for channel_id, item in writes:
+            if item is None:
+                batch.delete_item(Key={'channel_id': channel_id})
+            else:
+                batch.put_item(Item=item)
+
+    bump_convention_version(table)
+    print(
+        f"Conventions imported: {len(changes['created'])} created, {len(changes['updated'])} updated, "
+        f"{len(changes['deleted'])} deleted, {len(changes['unchanged'])} unchanged"
+    )
+    return changes
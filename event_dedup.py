@@ -0,0 +1,84 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from aws_clients import get_dynamodb_table
+
+# 환경 변수
+EVENT_DEDUP_TABLE = os.environ.get('EVENT_DEDUP_TABLE', 'slack-invitor-events')
+# 처리한 event_id를 기억하는 기간 (DynamoDB TTL, 초). Slack 재전송은 최대 수 분 안에 이루어짐
+EVENT_DEDUP_TTL_SECONDS = int(os.environ.get('EVENT_DEDUP_TTL_SECONDS', '3600'))
+# 웜 컨테이너에서 기억하는 최근 event_id 수
+EVENT_DEDUP_CACHE_SIZE = int(os.environ.get('EVENT_DEDUP_CACHE_SIZE', '1024'))
+
+# 최근에 처리한 event_id (LRU). DynamoDB 조회 없이 중복 이벤트를 걸러냄
+_seen = OrderedDict()
+_seen_lock = threading.Lock()
+
+def get_dedup_table():
+    """이벤트 중복 제거 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(EVENT_DEDUP_TABLE)
+
+def _remember(event_id):
+    with _seen_lock:
+        _seen[event_id] = True
+        _seen.move_to_end(event_id)
+        while len(_seen) > EVENT_DEDUP_CACHE_SIZE:
+            _seen.popitem(last=False)
+
+def _forget(event_id):
+    with _seen_lock:
+        _seen.pop(event_id, None)
+
+def claim_event(event_id):
+    """
+    이벤트를 처리할 권한을 얻습니다. 처음 받은 이벤트면 True, 이미 받은 이벤트면 False를 반환합니다.
+    최근 event_id는 메모리에서 바로 확인하고, 그 외에는 DynamoDB 조건부 쓰기로 확인합니다.
+    중복 제거 테이블을 사용할 수 없는 경우에는 처음 받은 이벤트로 간주합니다.
+    """
+    if not event_id:
+        return True
+
+    with _seen_lock:
+        if event_id in _seen:
+            _seen.move_to_end(event_id)
+            return False
+
+    now = int(time.time())
+    table = get_dedup_table()
+    try:
+        table.put_item(
+            Item={
+                'event_id': event_id,
+                'expires_at': now + EVENT_DEDUP_TTL_SECONDS
+            },
+            # TTL 삭제는 지연될 수 있으므로 만료된 항목은 없는 것으로 간주
+            ConditionExpression='attribute_not_exists(event_id) OR expires_at < :now',
+            ExpressionAttributeValues={
+                ':now': now
+            }
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        _remember(event_id)
+        return False
+    except Exception as e:
+        print(f"Error claiming event {event_id}: {str(e)}")
+        return True
+
+    _remember(event_id)
+    return True
+
+def release_event(event_id):
+    """처리에 실패한 이벤트의 기록을 지워 Slack 재전송 때 다시 처리되도록 합니다."""
+    if not event_id:
+        return
+
+    _forget(event_id)
+    try:
+        get_dedup_table().delete_item(
+            Key={
+                'event_id': event_id
+            }
+        )
+    except Exception as e:
+        print(f"Error releasing event {event_id}: {str(e)}")
@@ -0,0 +1,87 @@
+import os
+import json
+from aws_clients import get_client
+from tracing import trace
+
+# 환경 변수
+# 설정하지 않으면 slack_invitor가 큐 없이 요청 안에서 바로 이벤트를 처리합니다
+EVENT_QUEUE_URL = os.environ.get('EVENT_QUEUE_URL')
+
+# 큐를 거쳐 워커에서 처리하는 이벤트 타입
+QUEUED_EVENT_TYPES = ('team_join', 'user_change', 'member_joined_channel', 'member_left_channel')
+
+def get_sqs_client():
+    """SQS 클라이언트를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_client('sqs')
+
+def is_queue_enabled():
+    """이벤트 큐가 설정되어 있는지 확인합니다."""
+    return bool(EVENT_QUEUE_URL)
+
+def get_event_user_id(body):
+    """이벤트 대상 사용자 ID를 반환합니다. (team_join/user_change는 사용자 객체, 채널 이벤트는 ID 문자열)"""
+    user = body.get('event', {}).get('user')
+    if isinstance(user, dict):
+        return user.get('id')
+    return user
+
+def enqueue_event(body):
+    """
+    Slack 이벤트 본문을 SQS 큐에 넣습니다.
+    FIFO 큐(.fifo)이면 사용자별로 순서를 보장하고, event_id로 Slack 재전송을 중복 제거합니다.
+    """
+    params = {
+        'QueueUrl': EVENT_QUEUE_URL,
+        'MessageBody': json.dumps(body)
+    }
+
+    if EVENT_QUEUE_URL.endswith('.fifo'):
+        params['MessageGroupId'] = get_event_user_id(body) or 'default'
+        if body.get('event_id'):
+            params['MessageDeduplicationId'] = body['event_id']
+
+    with trace('sqs.send_message'):
+        return get_sqs_client().send_message(**params)
+
+def parse_queue_records(event):
+    """SQS 배치 이벤트를 [(message_id, Slack 이벤트 본문), ...]로 변환합니다."""
+    messages = []
+    for record in event.get('Records', []):
+        try:
+            body = json.loads(record.get('body', '{}'))
+        except json.JSONDecodeError:
+            print(f"Dropping malformed queue message: {record.get('messageId')}")
+            continue
+        messages.append((record.get('messageId'), body))
+    return messages
+
+def coalesce_events(messages):
+    """
+    같은 대상에 대한 이벤트를 하나로 합칩니다.
+    사용자 이벤트는 사용자별 가장 최근 이벤트만, 채널 입장/퇴장 이벤트는 (채널, 사용자)별 가장 최근 이벤트만 남깁니다.
+    반환값: [(Slack 이벤트 본문, 합쳐진 message_id 목록), ...]
+    """
+    latest = {}
+    for message_id, body in messages:
+        event = body.get('event', {})
+        event_type = event.get('type')
+        user_id = get_event_user_id(body)
+
+        if event_type in ('member_joined_channel', 'member_left_channel'):
+            key = ('membership', event.get('channel'), user_id)
+        elif user_id:
+            key = ('user', user_id)
+        else:
+            key = ('message', message_id)
+
+        entry = latest.get(key)
+        if entry is None:
+            latest[key] = [body, [message_id]]
+            continue
+
+        entry[1].append(message_id)
+        # event_time이 같거나 없으면 큐에서 나중에 받은 이벤트를 최신으로 간주
+        if body.get('event_time', 0) >= entry[0].get('event_time', 0):
+            entry[0] = body
+
+    return [(body, message_ids) for body, message_ids in latest.values()]
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import uuid
+import datetime
+from aws_clients import get_client, get_dynamodb_table
+
+# 환경 변수
+INVITE_JOB_TABLE = os.environ.get('INVITE_JOB_TABLE', 'slack-invitor-jobs')
+# 남은 실행 시간이 이 값(밀리초)보다 적으면 체크포인트를 저장하고 새 호출로 이어서 실행
+JOB_TIME_BUFFER_MS = int(os.environ.get('JOB_TIME_BUFFER_MS', '60000'))
+# 작업 항목 보관 기간 (DynamoDB TTL, 초)
+JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))
+
+# 숫자로 저장되는 작업 필드 (DynamoDB에서 Decimal로 읽히므로 int로 변환)
+_INTEGER_FIELDS = ('invited_count', 'invocations', 'crawl_started_at')
+
+# 작업 테이블의 정렬 키(channel_id) 값. 작업 진행 상태는 이 항목에, 채널별 컨벤션/통계/초대 대기 목록은
+# 채널 ID 항목에 나누어 저장하여 채널이 많아도 DynamoDB 항목 크기 제한(400KB)을 넘지 않도록 함
+JOB_HEADER_KEY = '#job'
+
+# 작업 진행 상태 항목에 저장하지 않고 채널 항목으로 나누어 저장하는 필드
+_CHANNEL_FIELDS = ('conventions', 'excluded_conventions', 'channel_stats', 'pending_invites')
+
+def get_job_table():
+    """작업 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(INVITE_JOB_TABLE)
+
+def get_lambda_client():
+    """Lambda 클라이언트를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_client('lambda')
+
+def create_job(conventions, member_source='slack', excluded_conventions=None, dry_run=False):
+    """
+    새 일괄 초대 작업을 만듭니다. conventions는 {channel_id: name_convention} 입니다.
+    member_source가 'snapshot'이면 users.list 대신 멤버 스냅샷에서 멤버를 읽습니다.
+    excluded_conventions({channel_id: 변경 전 컨벤션})에 일치하는 사용자는 해당 채널의 초대 대상에서 제외합니다.
+    dry_run이면 초대하지 않고 채널별 초대 계획만 계산합니다.
+    """
+    return {
+        'job_id': uuid.uuid4().hex,
+        'conventions': dict(conventions),
+        'excluded_conventions': dict(excluded_conventions or {}),
+        'status': 'running',
+        'dry_run': dry_run,
+        # 진행 단계: stream(멤버 페이지를 받는 대로 매칭 및 초대) → completed
+        'phase': 'stream',
+        'member_source': member_source,
+        'crawl_started_at': int(time.time()),
+        'users_cursor': None,
+        # 스냅샷 스캔의 다음 시작 키 (LastEvaluatedKey)
+        'snapshot_cursor': None,
+        'crawl_done': False,
+        # 보내지 않았거나 완료가 확인되지 않은 채널별 초대 대상 (이어서 실행할 때 다시 보냄)
+        'pending_invites': {},
+        # 채널별 매칭/초대 인원
+        'channel_stats': {
+            channel_id: {'matched': 0, 'invited': 0}
+            for channel_id in conventions
+        },
+        'invited_count': 0,
+        'invocations': 0
+    }
+
+def _channel_state(job, channel_id):
+    """채널 항목에 저장할 채널별 작업 상태를 만듭니다."""
+    stats = job['channel_stats'][channel_id]
+    state = {
+        'name_convention': job['conventions'][channel_id],
+        'matched': stats['matched'],
+        'invited': stats['invited']
+    }
+    excluded_convention = job['excluded_conventions'].get(channel_id)
+    if excluded_convention:
+        state['excluded_convention'] = excluded_convention
+    pending = job['pending_invites'].get(channel_id)
+    if pending:
+        state['pending_invites'] = list(pending)
+    return state
+
+def load_job(job_id):
+    """작업 테이블에서 체크포인트(진행 상태 항목과 채널 항목)를 읽어옵니다. 없으면 None을 반환합니다."""
+    request = {
+        'KeyConditionExpression': 'job_id = :job_id',
+        'ExpressionAttributeValues': {
+            ':job_id': job_id
+        },
+        'ConsistentRead': True
+    }
+
+    job = None
+    channels = {}
+    while True:
+        response = get_job_table().query(**request)
+        for item in response.get('Items', []):
+            if item['channel_id'] == JOB_HEADER_KEY:
+                job = item
+            else:
+                channels[item['channel_id']] = item
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if job is None:
+        return None
+
+    job.pop('channel_id', None)
+    if len(channels) != int(job.get('channel_count', len(channels))):
+        print(f"Job {job_id} has {len(channels)} channel items, expected {job['channel_count']}")
+    for field in _INTEGER_FIELDS:
+        job[field] = int(job.get(field, 0))
+
+    job['conventions'] = {}
+    job['excluded_conventions'] = {}
+    job['channel_stats'] = {}
+    job['pending_invites'] = {}
+    for channel_id, item in channels.items():
+        job['conventions'][channel_id] = item['name_convention']
+        if item.get('excluded_convention'):
+            job['excluded_conventions'][channel_id] = item['excluded_convention']
+        job['channel_stats'][channel_id] = {
+            'matched': int(item.get('matched', 0)),
+            'invited': int(item.get('invited', 0))
+        }
+        if item.get('pending_invites'):
+            job['pending_invites'][channel_id] = list(item['pending_invites'])
+
+    # 읽어온 채널 상태는 다시 쓰지 않도록 저장된 상태로 기억
+    job['_saved_channels'] = {channel_id: _channel_state(job, channel_id) for channel_id in channels}
+    return job
+
+def save_job(job):
+    """
+    작업 체크포인트를 저장합니다.
+    마지막 저장 이후 바뀐 채널 항목만 batch_writer로 쓰고, 그 다음 작업 진행 상태 항목을 씁니다.
+    """
+    table = get_job_table()
+    expires_at = int(time.time()) + JOB_RETENTION_SECONDS
+    saved_channels = job.setdefault('_saved_channels', {})
+
+    with table.batch_writer() as batch:
+        for channel_id in job['conventions']:
+            state = _channel_state(job, channel_id)
+            if saved_channels.get(channel_id) == state:
+                continue
+            batch.put_item(Item=dict(state, job_id=job['job_id'], channel_id=channel_id, expires_at=expires_at))
+            saved_channels[channel_id] = state
+
+    item = {
+        key: value for key, value in job.items()
+        if key not in _CHANNEL_FIELDS and not key.startswith('_')
+    }
+    item['channel_id'] = JOB_HEADER_KEY
+    item['channel_count'] = len(job['conventions'])
+    item['updated_date'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    item['expires_at'] = expires_at
+
+    table.put_item(Item=item)
+
+def has_time_left(context):
+    """Lambda 남은 실행 시간이 한 단계를 더 처리하기에 충분한지 확인합니다."""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return True
+    return context.get_remaining_time_in_millis() > JOB_TIME_BUFFER_MS
+
+def check_time_budget(context):
+    """
+    Lambda 타임아웃이 JOB_TIME_BUFFER_MS보다 길어 한 단계 이상 처리할 수 있는지 확인합니다.
+    짧으면 호출마다 아무것도 처리하지 못하고 작업만 넘기게 되므로 ValueError를 발생시킵니다.
+    """
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return
+    remaining_ms = context.get_remaining_time_in_millis()
+    if remaining_ms <= JOB_TIME_BUFFER_MS:
+        raise ValueError(
+            f"Lambda 남은 실행 시간({remaining_ms}ms)이 JOB_TIME_BUFFER_MS({JOB_TIME_BUFFER_MS}ms)보다 짧습니다. "
+            f"Lambda 타임아웃을 늘리거나 JOB_TIME_BUFFER_MS를 줄여주세요."
+        )
+
+def continue_job_async(job, context):
+    """체크포인트를 저장하고 같은 Lambda 함수를 비동기로 다시 호출하여 작업을 이어갑니다."""
+    save_job(job)
+
+    response = get_lambda_client().invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',  # 비동기 호출
+        Payload=json.dumps({
+            'job_id': job['job_id']
+        })
+    )
+
+    print(f"Job {job['job_id']} checkpointed at phase {job['phase']}, continuing in new invocation: {response.get('StatusCode')}")
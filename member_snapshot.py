@@ -0,0 +1,99 @@
+import os
+import time
+from convention_store import scan_pages, scan_page
+from aws_clients import get_dynamodb_table
+
+# 환경 변수
+MEMBER_SNAPSHOT_TABLE = os.environ.get('MEMBER_SNAPSHOT_TABLE', 'slack-invitor-members')
+# 스냅샷을 신뢰하는 기간 (초). 이 기간이 지나면 일괄 초대 시 users.list를 다시 크롤링합니다
+MEMBER_SNAPSHOT_MAX_AGE = int(os.environ.get('MEMBER_SNAPSHOT_MAX_AGE', str(24 * 3600)))
+# 컨벤션 변경분만 초대하는 경우에 스냅샷을 신뢰하는 기간 (초).
+# 스냅샷은 이벤트로 계속 갱신되므로 변경분 초대에는 더 오래된 스냅샷도 사용합니다
+MEMBER_SNAPSHOT_DIFF_MAX_AGE = int(os.environ.get('MEMBER_SNAPSHOT_DIFF_MAX_AGE', str(7 * 24 * 3600)))
+# 스냅샷 테이블 병렬 스캔 세그먼트 수
+MEMBER_SNAPSHOT_SCAN_SEGMENTS = int(os.environ.get('MEMBER_SNAPSHOT_SCAN_SEGMENTS', '4'))
+
+# 마지막 전체 갱신 시각을 저장하는 메타 항목의 파티션 키 (사용자 ID와 겹치지 않음)
+SNAPSHOT_META_KEY = '#snapshot'
+
+# 스냅샷에 저장하는 멤버 속성
+MEMBER_ATTRIBUTES = ('user_id', 'user_name', 'is_bot', 'deleted')
+
+def get_snapshot_table():
+    """멤버 스냅샷 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(MEMBER_SNAPSHOT_TABLE)
+
+def get_effective_name(user):
+    """사용자 이름 확인 (display_name이 비어있으면 real_name 사용)"""
+    display_name = user.get('profile', {}).get('display_name', '')
+    real_name = user.get('profile', {}).get('real_name', '')
+    return display_name if display_name else real_name
+
+def to_member_record(user):
+    """Slack 사용자 객체를 스냅샷에 저장할 간단한 레코드로 변환합니다."""
+    return {
+        'user_id': user.get('id'),
+        'user_name': get_effective_name(user),
+        'is_bot': bool(user.get('is_bot', False)),
+        'deleted': bool(user.get('deleted', False))
+    }
+
+def is_active_record(record):
+    """봇, 삭제된 사용자, Slackbot이 아닌 멤버인지 확인합니다."""
+    return (
+        not record.get('is_bot', False)
+        and not record.get('deleted', False)
+        and record.get('user_id') != 'USLACKBOT'  # Slackbot 제외
+    )
+
+def is_snapshot_fresh(table, max_age=MEMBER_SNAPSHOT_MAX_AGE):
+    """마지막 전체 갱신이 max_age(초) 이내인지 확인합니다."""
+    try:
+        response = table.get_item(
+            Key={
+                'user_id': SNAPSHOT_META_KEY
+            }
+        )
+        refreshed_at = int(response.get('Item', {}).get('refreshed_at', 0))
+        return time.time() - refreshed_at < max_age
+    except Exception as e:
+        print(f"Error checking member snapshot: {str(e)}")
+        return False
+
+def mark_snapshot_refreshed(table, refreshed_at):
+    """전체 크롤링이 끝난 시각을 기록합니다. refreshed_at은 크롤링을 시작한 시각입니다."""
+    table.put_item(
+        Item={
+            'user_id': SNAPSHOT_META_KEY,
+            'refreshed_at': int(refreshed_at)
+        }
+    )
+
+def write_member_records(table, records):
+    """users.list 한 페이지의 레코드를 batch_writer로 저장합니다."""
+    with table.batch_writer(overwrite_by_pkeys=['user_id']) as batch:
+        for record in records:
+            if record.get('user_id'):
+                batch.put_item(Item=record)
+
+def upsert_member(table, user):
+    """team_join/user_change 이벤트의 사용자 정보로 스냅샷을 갱신합니다."""
+    try:
+        record = to_member_record(user)
+        if record['user_id']:
+            table.put_item(Item=record)
+    except Exception as e:
+        print(f"Error updating member snapshot: {str(e)}")
+
+def scan_member_records(table):
+    """스냅샷의 모든 멤버 레코드를 페이지 단위로 생성하는 제너레이터입니다."""
+    for page in scan_pages(table, MEMBER_ATTRIBUTES, MEMBER_SNAPSHOT_SCAN_SEGMENTS):
+        yield [record for record in page if record.get('user_id') != SNAPSHOT_META_KEY]
+
+def scan_member_page(table, start_key=None):
+    """
+    스냅샷을 한 페이지만 스캔하여 (멤버 레코드 리스트, 다음 시작 키)를 반환합니다.
+    일괄 초대 작업이 시작 키를 저장해 두었다가 다음 단계나 다음 호출에서 이어서 읽습니다.
+    """
+    items, next_key = scan_page(table, MEMBER_ATTRIBUTES, start_key)
+    return [record for record in items if record.get('user_id') != SNAPSHOT_META_KEY], next_key
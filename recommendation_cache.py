@@ -0,0 +1,130 @@
+import os
+import time
+import hashlib
+import threading
+from aws_clients import get_dynamodb_table
+
+# 환경 변수
+RECOMMENDATION_CACHE_TABLE = os.environ.get('RECOMMENDATION_CACHE_TABLE', 'slack-invitor-recommendations')
+# 생성한 추천을 재사용하는 기간 (DynamoDB TTL, 초)
+RECOMMENDATION_CACHE_TTL = int(os.environ.get('RECOMMENDATION_CACHE_TTL', str(6 * 3600)))
+# 추천을 생성 중인 요청이 있을 때 같은 요청을 다시 생성하지 않는 기간 (초)
+RECOMMENDATION_PENDING_TTL = int(os.environ.get('RECOMMENDATION_PENDING_TTL', '120'))
+
+# 추천과 함께 저장하는 충돌 예시 수 (메시지에는 몇 개만 표시하므로 항목 크기를 작게 유지)
+RECOMMENDATION_STORED_CONFLICTS = 10
+
+# 웜 컨테이너에서 재사용하는 추천 캐시 {cache_key: ((recommendation, conflicts, conflict_count), expires_at)}
+_memory_cache = {}
+_memory_lock = threading.Lock()
+
+def get_recommendation_table():
+    """추천 캐시 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(RECOMMENDATION_CACHE_TABLE)
+
+def hash_conventions(conventions):
+    """기존 컨벤션 집합의 해시를 반환합니다. 순서와 관계없이 같은 집합이면 같은 값입니다."""
+    digest = hashlib.sha256()
+    for channel_id, convention in sorted(conventions):
+        digest.update(f"{channel_id}\0{convention}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def make_cache_key(channel_name, conventions):
+    """채널 이름과 기존 컨벤션 집합으로 캐시 키를 만듭니다. 컨벤션이 바뀌면 다른 키가 됩니다."""
+    return f"{channel_name}#{hash_conventions(conventions)}"
+
+def _remember(cache_key, recommendation, expires_at):
+    with _memory_lock:
+        _memory_cache[cache_key] = (recommendation, expires_at)
+        # 만료된 항목 정리
+        now = time.time()
+        for key in [key for key, (_, expiry) in _memory_cache.items() if expiry <= now]:
+            del _memory_cache[key]
+
+def get_cached_recommendation(cache_key):
+    """
+    캐시된 추천을 (recommendation, conflicts, conflict_count)로 반환합니다. 없거나 만료되었으면 None을 반환합니다.
+    캐시 키에 기존 컨벤션 집합의 해시가 들어 있으므로 함께 저장한 충돌 목록을 다시 계산하지 않고 사용합니다.
+    """
+    now = time.time()
+    with _memory_lock:
+        cached = _memory_cache.get(cache_key)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    try:
+        response = get_recommendation_table().get_item(
+            Key={
+                'cache_key': cache_key
+            }
+        )
+    except Exception as e:
+        print(f"Error reading recommendation cache: {str(e)}")
+        return None
+
+    item = response.get('Item')
+    # TTL 삭제는 지연될 수 있으므로 만료 시각을 직접 확인
+    if not item or not item.get('recommendation') or int(item.get('expires_at', 0)) <= now:
+        return None
+
+    conflicts = [tuple(conflict) for conflict in item.get('conflicts', [])]
+    recommendation = (item['recommendation'], conflicts, int(item.get('conflict_count', len(conflicts))))
+    _remember(cache_key, recommendation, int(item['expires_at']))
+    return recommendation
+
+def claim_recommendation(cache_key):
+    """
+    추천 생성을 시작해도 되는지 확인합니다.
+    같은 키의 추천을 다른 요청이 생성 중이면 False를 반환합니다.
+    캐시 테이블을 사용할 수 없는 경우에는 생성을 시작합니다.
+    """
+    now = int(time.time())
+    table = get_recommendation_table()
+    try:
+        table.put_item(
+            Item={
+                'cache_key': cache_key,
+                'expires_at': now + RECOMMENDATION_PENDING_TTL
+            },
+            ConditionExpression='attribute_not_exists(cache_key) OR expires_at < :now',
+            ExpressionAttributeValues={
+                ':now': now
+            }
+        )
+        return True
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+    except Exception as e:
+        print(f"Error claiming recommendation: {str(e)}")
+        return True
+
+def store_recommendation(cache_key, recommendation, conflicts=()):
+    """생성한 추천을 다른 채널 컨벤션과의 충돌 목록(앞부분과 전체 수)과 함께 캐시에 저장합니다."""
+    expires_at = int(time.time()) + RECOMMENDATION_CACHE_TTL
+    stored_conflicts = [tuple(conflict) for conflict in conflicts[:RECOMMENDATION_STORED_CONFLICTS]]
+    _remember(cache_key, (recommendation, stored_conflicts, len(conflicts)), expires_at)
+
+    try:
+        get_recommendation_table().put_item(
+            Item={
+                'cache_key': cache_key,
+                'recommendation': recommendation,
+                'conflicts': [list(conflict) for conflict in stored_conflicts],
+                'conflict_count': len(conflicts),
+                'expires_at': expires_at
+            }
+        )
+    except Exception as e:
+        print(f"Error storing recommendation: {str(e)}")
+
+def release_recommendation(cache_key):
+    """추천 생성에 실패했을 때 생성 중 표시를 지워 다음 요청에서 다시 생성하도록 합니다."""
+    try:
+        get_recommendation_table().delete_item(
+            Key={
+                'cache_key': cache_key
+            },
+            ConditionExpression='attribute_not_exists(recommendation)'
+        )
+    except Exception as e:
+        print(f"Error releasing recommendation: {str(e)}")
@@ -0,0 +1,8 @@
+"""
+실제 Slack/AWS 없이 Lambda 핸들러를 실행해 보기 위한 로컬 시뮬레이션 도구입니다.
+
+- fake_slack: users.list, conversations.members/invite/info를 구현한 가짜 Slack Web API
+- fake_aws: 가짜 DynamoDB 테이블과 Lambda/SQS 클라이언트
+- workspace: 대규모 가상 워크스페이스(사용자, 채널 컨벤션) 생성
+- run: 위 구성으로 일괄 초대/이벤트 처리를 실행하고 처리량을 측정하는 명령줄 도구
+"""
@@ -0,0 +1,420 @@
+"""
+로컬 DynamoDB/Lambda/SQS 대체 구현입니다.
+이 저장소의 코드가 사용하는 기능(get/put/update/delete_item, 조건식, 병렬 스캔, 보조 인덱스 query, batch_writer)만 구현합니다.
+실제 DynamoDB처럼 400KB를 넘는 항목은 쓰지 않고 오류를 발생시킵니다.
+"""
+import json
+import threading
+from decimal import Decimal
+
+
+# DynamoDB 항목 크기 제한 (바이트)
+MAX_ITEM_BYTES = 400 * 1024
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+class ValidationException(Exception):
+    pass
+
+
+class _Exceptions:
+    ConditionalCheckFailedException = ConditionalCheckFailedException
+
+
+def _serialize(value):
+    """파이썬 값을 DynamoDB 저수준 API 형식({'S': ...} 등)으로 변환합니다."""
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, float, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, str):
+        return {'S': value}
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, (set, frozenset)):
+        if all(isinstance(v, str) for v in value):
+            return {'SS': sorted(value)}
+        return {'NS': sorted(str(v) for v in value)}
+    if isinstance(value, (list, tuple)):
+        return {'L': [_serialize(v) for v in value]}
+    if isinstance(value, dict):
+        return {'M': {k: _serialize(v) for k, v in value.items()}}
+    raise TypeError(f"Unsupported type: {type(value)}")
+
+
+def _item_size(item):
+    """속성 이름과 값의 직렬화 크기로 항목 크기를 어림합니다."""
+    return sum(
+        len(name.encode('utf-8')) + len(json.dumps(_serialize(value), ensure_ascii=False).encode('utf-8'))
+        for name, value in item.items()
+    )
+
+
+def _copy(item):
+    return {key: set(value) if isinstance(value, set) else value for key, value in item.items()}
+
+
+def _split_top_level(expression, keyword):
+    return [part.strip() for part in expression.split(f' {keyword} ')]
+
+
+def _evaluate_condition(expression, item, values, names):
+    """OR/AND, attribute_exists/attribute_not_exists, 비교 연산자만 지원하는 조건식 평가기입니다."""
+    def resolve(token):
+        token = token.strip()
+        if token.startswith(':'):
+            return values[token]
+        return item.get(names.get(token, token))
+
+    def clause(text):
+        text = text.strip()
+        if text.startswith('attribute_not_exists('):
+            return names.get(text[21:-1], text[21:-1]) not in item
+        if text.startswith('attribute_exists('):
+            return names.get(text[17:-1], text[17:-1]) in item
+        for op in ('<>', '<=', '>=', '=', '<', '>'):
+            if f' {op} ' in text:
+                left, right = text.split(f' {op} ', 1)
+                a, b = resolve(left), resolve(right)
+                if a is None or b is None:
+                    return op == '<>' and a != b
+                return {
+                    '<>': a != b, '=': a == b, '<': a < b, '>': a > b, '<=': a <= b, '>=': a >= b
+                }[op]
+        raise ValueError(f"Unsupported condition: {text}")
+
+    return any(
+        all(clause(part) for part in _split_top_level(alternative, 'AND'))
+        for alternative in _split_top_level(expression, 'OR')
+    )
+
+
+def _tokenize_update(expression):
+    """업데이트 식을 토큰으로 나눕니다. if_not_exists(a, :b) 같은 함수 호출은 하나의 토큰으로 둡니다."""
+    tokens = []
+    current = ''
+    depth = 0
+    for char in expression:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if depth == 0 and (char.isspace() or char == ','):
+            if current:
+                tokens.append(current)
+            if char == ',':
+                tokens.append(',')
+            current = ''
+        else:
+            current += char
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+def _set_value(operand, old, values, names):
+    """SET 절의 값(:값, 속성 이름, if_not_exists(속성, :값))을 업데이트 전 항목 기준으로 계산합니다."""
+    if operand.startswith('if_not_exists('):
+        path, default = [part.strip() for part in operand[len('if_not_exists('):-1].split(',')]
+        path = names.get(path, path)
+        return old[path] if path in old else values[default]
+    if operand.startswith(':'):
+        return values[operand]
+    return old[names.get(operand, operand)]
+
+
+def _apply_update(expression, item, values, names):
+    """SET/ADD/REMOVE/DELETE 절을 적용하고 변경된 속성 이름 목록을 반환합니다."""
+    sections = {}
+    current = None
+    for token in _tokenize_update(expression):
+        if token in ('SET', 'ADD', 'REMOVE', 'DELETE'):
+            current = token
+            sections.setdefault(current, [[]])
+        elif token == ',':
+            sections[current].append([])
+        else:
+            sections[current][-1].append(token)
+
+    old = _copy(item)
+    changed = []
+    for action, clauses in sections.items():
+        for tokens in clauses:
+            if not tokens:
+                continue
+            name = names.get(tokens[0], tokens[0])
+            changed.append(name)
+            if action == 'SET':
+                item[name] = _set_value(tokens[-1], old, values, names)
+            elif action == 'REMOVE':
+                item.pop(name, None)
+            elif action == 'ADD':
+                value = values[tokens[-1]]
+                if isinstance(value, (set, frozenset)):
+                    item[name] = set(item.get(name, set())) | set(value)
+                else:
+                    item[name] = item.get(name, 0) + value
+            elif action == 'DELETE':
+                remaining = set(item.get(name, set())) - set(values[tokens[-1]])
+                if remaining:
+                    item[name] = remaining
+                else:
+                    item.pop(name, None)
+    return changed
+
+
+class _BatchWriter:
+    """쓰기를 모아 두었다가 BatchWriteItem처럼 25개씩 적용합니다."""
+
+    BATCH_SIZE = 25
+
+    def __init__(self, table):
+        self.table = table
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._flush()
+        return False
+
+    def put_item(self, Item):
+        self.pending.append(('put', Item))
+        if len(self.pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def delete_item(self, Key):
+        self.pending.append(('delete', Key))
+        if len(self.pending) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        table = self.table
+        table.stats['batch_write_item'] += 1
+        with table.lock:
+            for action, value in self.pending:
+                if action == 'put':
+                    table._check_size(value)
+                    table.items[table._key(value)] = _copy(value)
+                else:
+                    table.items.pop(table._key(value), None)
+        self.pending = []
+
+
+class _FakeClient:
+    """테이블의 meta.client. scan_pages가 사용하는 저수준 scan만 구현합니다."""
+
+    exceptions = _Exceptions
+
+    def __init__(self, table):
+        self.table = table
+
+    def scan(self, TableName=None, ProjectionExpression=None, ExpressionAttributeNames=None,
+             Segment=0, TotalSegments=1, ExclusiveStartKey=None, Limit=None, **kwargs):
+        table = self.table
+        table.stats['scan'] += 1
+        attributes = None
+        if ProjectionExpression:
+            names = ExpressionAttributeNames or {}
+            attributes = [names.get(part.strip(), part.strip()) for part in ProjectionExpression.split(',')]
+
+        with table.lock:
+            keys = [key for key in table.items if hash(key) % TotalSegments == Segment]
+            start = 0
+            if ExclusiveStartKey:
+                start = keys.index(table._key({name: value['S'] for name, value in ExclusiveStartKey.items()})) + 1
+            page_size = Limit or table.scan_page_size
+            page_keys = keys[start:start + page_size]
+            items = [table.items[key] for key in page_keys]
+
+        response = {
+            'Items': [
+                {
+                    name: _serialize(value) for name, value in item.items()
+                    if attributes is None or name in attributes
+                }
+                for item in items
+            ]
+        }
+        if start + page_size < len(keys):
+            response['LastEvaluatedKey'] = {
+                name: {'S': value} for name, value in table._key_attributes(table.items[page_keys[-1]]).items()
+            }
+        return response
+
+
+class _Meta:
+    def __init__(self, table):
+        self.client = _FakeClient(table)
+
+
+class FakeTable:
+    """boto3 DynamoDB Table 리소스를 흉내 내는 메모리 테이블입니다. 파티션 키와 정렬 키는 문자열이어야 합니다."""
+
+    def __init__(self, name, key_name, sort_key_name=None, scan_page_size=1000):
+        self.name = name
+        self.key_name = key_name
+        self.sort_key_name = sort_key_name
+        self.scan_page_size = scan_page_size
+        self.items = {}
+        self.lock = threading.Lock()
+        self.meta = _Meta(self)
+        self.stats = {
+            'get_item': 0, 'put_item': 0, 'update_item': 0, 'delete_item': 0, 'batch_write_item': 0, 'scan': 0, 'query': 0
+        }
+
+    def _key(self, item):
+        if self.sort_key_name is None:
+            return item[self.key_name]
+        return (item[self.key_name], item[self.sort_key_name])
+
+    def _key_attributes(self, item):
+        names = (self.key_name,) if self.sort_key_name is None else (self.key_name, self.sort_key_name)
+        return {name: item[name] for name in names}
+
+    def _check_size(self, item):
+        size = _item_size(item)
+        if size > MAX_ITEM_BYTES:
+            raise ValidationException(f"Item size has exceeded the maximum allowed size ({size} bytes, {self.name})")
+
+    def _check(self, item, condition, values, names):
+        if condition and not _evaluate_condition(condition, item or {}, values or {}, names or {}):
+            raise ConditionalCheckFailedException(f"The conditional request failed ({self.name})")
+
+    def get_item(self, Key, **kwargs):
+        self.stats['get_item'] += 1
+        with self.lock:
+            item = self.items.get(self._key(Key))
+            return {'Item': _copy(item)} if item is not None else {}
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None,
+                 ExpressionAttributeNames=None, **kwargs):
+        self.stats['put_item'] += 1
+        key = self._key(Item)
+        self._check_size(Item)
+        with self.lock:
+            self._check(self.items.get(key), ConditionExpression, ExpressionAttributeValues, ExpressionAttributeNames)
+            self.items[key] = _copy(Item)
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ConditionExpression=None, ExpressionAttributeValues=None,
+                    ExpressionAttributeNames=None, ReturnValues='NONE', **kwargs):
+        self.stats['update_item'] += 1
+        key = self._key(Key)
+        values = ExpressionAttributeValues or {}
+        names = ExpressionAttributeNames or {}
+        with self.lock:
+            old = self.items.get(key)
+            self._check(old, ConditionExpression, values, names)
+            item = _copy(old) if old is not None else dict(Key)
+            changed = _apply_update(UpdateExpression, item, values, names)
+            self._check_size(item)
+            self.items[key] = item
+
+        response = {}
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = _copy(old)
+        elif ReturnValues == 'ALL_NEW':
+            response['Attributes'] = _copy(item)
+        elif ReturnValues == 'UPDATED_NEW':
+            response['Attributes'] = {name: item[name] for name in changed if name in item}
+        return response
+
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeValues=None,
+                    ExpressionAttributeNames=None, ReturnValues='NONE', **kwargs):
+        self.stats['delete_item'] += 1
+        key = self._key(Key)
+        with self.lock:
+            self._check(self.items.get(key), ConditionExpression, ExpressionAttributeValues, ExpressionAttributeNames)
+            old = self.items.pop(key, None)
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            return {'Attributes': _copy(old)}
+        return {}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues=None, ExpressionAttributeNames=None,
+              IndexName=None, ProjectionExpression=None, **kwargs):
+        """키 조건과 일치하는 항목을 한 페이지로 반환합니다. 보조 인덱스(IndexName)는 키 조건의 속성으로만 구분합니다."""
+        self.stats['query'] += 1
+        names = ExpressionAttributeNames or {}
+        attributes = None
+        if ProjectionExpression:
+            attributes = [names.get(part.strip(), part.strip()) for part in ProjectionExpression.split(',')]
+
+        with self.lock:
+            items = [
+                _copy(item) for item in self.items.values()
+                if _evaluate_condition(KeyConditionExpression, item, ExpressionAttributeValues or {}, names)
+            ]
+        if attributes is not None:
+            items = [{name: value for name, value in item.items() if name in attributes} for item in items]
+        return {'Items': items, 'Count': len(items)}
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return _BatchWriter(self)
+
+
+class FakeLambdaClient:
+    """Lambda invoke 요청을 기록만 합니다."""
+
+    def __init__(self):
+        self.invocations = []
+
+    def invoke(self, FunctionName, InvocationType='RequestResponse', Payload='{}', **kwargs):
+        self.invocations.append({
+            'function_name': FunctionName,
+            'invocation_type': InvocationType,
+            'payload': json.loads(Payload)
+        })
+        return {'StatusCode': 202 if InvocationType == 'Event' else 200}
+
+
+class FakeSQSClient:
+    """SQS send_message 요청을 기록만 합니다."""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, QueueUrl, MessageBody, **kwargs):
+        message_id = str(len(self.messages))
+        self.messages.append({'messageId': message_id, 'body': MessageBody, **kwargs})
+        return {'MessageId': message_id}
+
+
+# 저장소의 각 모듈이 사용하는 테이블 (모듈, 테이블 이름 상수, 파티션 키, 정렬 키)
+TABLE_DEFINITIONS = (
+    ('convention_store', 'DYNAMODB_TABLE', 'channel_id', None),
+    ('user_state', 'USER_STATE_TABLE', 'user_id', None),
+    ('invite_job', 'INVITE_JOB_TABLE', 'job_id', 'channel_id'),
+    ('member_snapshot', 'MEMBER_SNAPSHOT_TABLE', 'user_id', None),
+    ('channel_membership', 'CHANNEL_MEMBERS_TABLE', 'channel_id', None),
+    ('event_dedup', 'EVENT_DEDUP_TABLE', 'event_id', None),
+    ('recommendation_cache', 'RECOMMENDATION_CACHE_TABLE', 'cache_key', None),
+)
+
+
+def install_fake_aws():
+    """
+    모든 테이블과 Lambda/SQS 클라이언트를 가짜 구현으로 교체합니다.
+    반환값: {'tables': {테이블 이름: FakeTable}, 'lambda': FakeLambdaClient, 'sqs': FakeSQSClient}
+    """
+    import importlib
+    from aws_clients import set_client, set_table
+
+    tables = {}
+    for module_name, constant, key_name, sort_key_name in TABLE_DEFINITIONS:
+        table_name = getattr(importlib.import_module(module_name), constant)
+        tables[table_name] = FakeTable(table_name, key_name, sort_key_name)
+        set_table(table_name, tables[table_name])
+
+    lambda_client = FakeLambdaClient()
+    sqs_client = FakeSQSClient()
+    set_client('lambda', lambda_client)
+    set_client('sqs', sqs_client)
+
+    return {'tables': tables, 'lambda': lambda_client, 'sqs': sqs_client}
@@ -0,0 +1,170 @@
+"""
+로컬 가짜 Slack Web API입니다.
+slack_client.set_session()으로 requests 세션 대신 설치하면 users.list, conversations.members,
+conversations.invite, conversations.info 호출과 response_url 응답을 메모리의 워크스페이스로 처리합니다.
+호출마다 지연 시간을 넣을 수 있고, 메서드별 속도 제한과 무작위 429 응답을 흉내 냅니다.
+"""
+import time
+import random
+import threading
+from collections import deque
+
+# Slack 메서드별 기본 속도 제한 (분당 호출 수, Web API Tier 기준)
+SLACK_RATE_LIMITS = {
+    'users.list': 20,              # Tier 2
+    'conversations.members': 100,  # Tier 4
+    'conversations.invite': 50,    # Tier 3
+    'conversations.info': 100      # Tier 3 (짧은 버스트 허용)
+}
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self._data = data
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+
+class FakeSlackWorkspace:
+    """
+    가짜 Slack 워크스페이스와 Web API입니다.
+    users: Slack 사용자 객체 목록, channels: {channel_id: {'name': ..., 'members': set}}
+
+    latency: 호출마다 대기하는 시간(초), jitter: 지연 시간에 더하는 무작위 비율
+    rate_limits: {method: 분당 호출 수}. None이면 속도 제한 없음
+    error_rate: 속도 제한과 관계없이 무작위로 429를 돌려주는 비율
+    time_scale: 속도 제한 창과 Retry-After에 곱하는 배율 (1보다 작으면 빠르게 시뮬레이션)
+    """
+
+    def __init__(self, users, channels, latency=0.0, jitter=0.0, rate_limits=None,
+                 error_rate=0.0, time_scale=1.0, seed=0):
+        self.users = list(users)
+        self.user_ids = {user['id'] for user in self.users}
+        self.channels = channels
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limits = rate_limits
+        self.error_rate = error_rate
+        self.time_scale = time_scale
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.windows = {}
+        self.stats = {'calls': {}, 'rate_limited': 0, 'invited': 0, 'responses': []}
+
+    # requests.Session 인터페이스
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        return self._handle(url, dict(params or {}))
+
+    def post(self, url, params=None, json=None, timeout=None, **kwargs):
+        if not url.startswith('http') or '/api/' in url:
+            return self._handle(url, dict(json or {}))
+        # response_url로 보낸 지연 응답
+        with self.lock:
+            self.stats['responses'].append(json)
+        return FakeResponse({'ok': True})
+
+    def _handle(self, url, params):
+        method = url.rsplit('/', 1)[-1]
+        self._sleep()
+
+        retry_after = self._rate_limit(method)
+        if retry_after is not None:
+            with self.lock:
+                self.stats['rate_limited'] += 1
+            return FakeResponse({'ok': False, 'error': 'ratelimited'}, 429, {'Retry-After': f"{retry_after:.3f}"})
+
+        with self.lock:
+            self.stats['calls'][method] = self.stats['calls'].get(method, 0) + 1
+
+        handler = getattr(self, '_' + method.replace('.', '_'), None)
+        if handler is None:
+            return FakeResponse({'ok': False, 'error': 'unknown_method'})
+        return FakeResponse(handler(params))
+
+    def _sleep(self):
+        if self.latency:
+            with self.lock:
+                jitter = self.random.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency * (1 + jitter))
+
+    def _rate_limit(self, method):
+        """속도 제한을 넘었으면 Retry-After(초)를, 아니면 None을 반환합니다."""
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                return 1.0 * self.time_scale
+
+            limit = (self.rate_limits or {}).get(method)
+            if not limit:
+                return None
+
+            window = 60.0 * self.time_scale
+            now = time.monotonic()
+            calls = self.windows.setdefault(method, deque())
+            while calls and now - calls[0] >= window:
+                calls.popleft()
+            if len(calls) >= limit:
+                return max(window - (now - calls[0]), 0.001)
+            calls.append(now)
+            return None
+
+    # Slack Web API 메서드
+
+    def _page(self, items, params, default_limit):
+        start = int(params.get('cursor') or 0)
+        limit = int(params.get('limit') or default_limit)
+        end = start + limit
+        return items[start:end], str(end) if end < len(items) else ''
+
+    def _users_list(self, params):
+        members, next_cursor = self._page(self.users, params, 100)
+        return {'ok': True, 'members': members, 'response_metadata': {'next_cursor': next_cursor}}
+
+    def _conversations_members(self, params):
+        channel = self.channels.get(params.get('channel'))
+        if channel is None:
+            return {'ok': False, 'error': 'channel_not_found'}
+        with self.lock:
+            member_ids = sorted(channel['members'])
+        members, next_cursor = self._page(member_ids, params, 100)
+        return {'ok': True, 'members': members, 'response_metadata': {'next_cursor': next_cursor}}
+
+    def _conversations_info(self, params):
+        channel = self.channels.get(params.get('channel'))
+        if channel is None:
+            return {'ok': False, 'error': 'channel_not_found'}
+        return {'ok': True, 'channel': {'id': params['channel'], 'name': channel['name']}}
+
+    def _conversations_invite(self, params):
+        channel = self.channels.get(params.get('channel'))
+        if channel is None:
+            return {'ok': False, 'error': 'channel_not_found'}
+
+        user_ids = [user_id for user_id in str(params.get('users', '')).split(',') if user_id]
+        if len(user_ids) > 1000:
+            return {'ok': False, 'error': 'too_many_users'}
+
+        errors = []
+        with self.lock:
+            invitable = []
+            for user_id in user_ids:
+                if user_id not in self.user_ids:
+                    errors.append({'user': user_id, 'ok': False, 'error': 'user_not_found'})
+                elif user_id in channel['members']:
+                    errors.append({'user': user_id, 'ok': False, 'error': 'already_in_channel'})
+                else:
+                    invitable.append(user_id)
+
+            # force가 없으면 한 명이라도 실패할 때 요청 전체가 실패
+            if errors and not params.get('force'):
+                return {'ok': False, 'error': errors[0]['error']}
+            channel['members'].update(invitable)
+            self.stats['invited'] += len(invitable)
+
+        response = {'ok': True, 'channel': {'id': params['channel']}}
+        if errors:
+            response['errors'] = errors
+        return response
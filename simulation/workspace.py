@@ -0,0 +1,78 @@
+"""
+시뮬레이션용 가상 워크스페이스를 만듭니다.
+
+사용자 이름은 `연도_소속_팀_이름번호` 형식이며, 채널 컨벤션은 실제 사용 형태를 흉내 내어
+접두사 패턴(`2025_인하대_캡스톤_*`), 정확히 일치하는 이름, 중간/끝 와일드카드 패턴을 섞어 만듭니다.
+"""
+import random
+
+YEARS = [str(year) for year in range(2019, 2027)]
+ORGS = [f"org{index:02d}" for index in range(50)] + ['인하대', '서울대', '카이스트', '포스텍', '연세대']
+TEAMS = [f"team{index:02d}" for index in range(40)] + ['캡스톤', '백엔드', '프론트', '디자인', '운영']
+PEOPLE = ['kim', 'lee', 'park', 'choi', 'jung', 'kang', 'cho', 'yoon', '홍길동', '김철수', '이영희']
+
+# 컨벤션 종류별 비율 (접두사, 정확히 일치, 중간 와일드카드, 끝 와일드카드)
+CONVENTION_MIX = (('prefix', 0.75), ('exact', 0.15), ('infix', 0.07), ('suffix', 0.03))
+
+
+def generate_users(num_users, rng):
+    """Slack users.list 형식의 사용자 객체 목록을 만듭니다. 약 2%는 봇 또는 비활성 사용자입니다."""
+    users = []
+    for index in range(num_users):
+        name = f"{rng.choice(YEARS)}_{rng.choice(ORGS)}_{rng.choice(TEAMS)}_{rng.choice(PEOPLE)}{index}"
+        roll = rng.random()
+        # 일부 사용자는 display_name 없이 real_name만 있음
+        profile = {'display_name': name, 'real_name': name} if roll > 0.1 else {'display_name': '', 'real_name': name}
+        users.append({
+            'id': f"U{index:07d}",
+            'name': f"user{index}",
+            'deleted': roll < 0.01,
+            'is_bot': 0.01 <= roll < 0.02,
+            'profile': profile
+        })
+    return users
+
+
+def generate_conventions(num_conventions, users, rng):
+    """{channel_id: name_convention} 형태의 채널 컨벤션을 만듭니다. 접두사 패턴은 서로 겹치지 않습니다."""
+    prefixes = [f"{year}_{org}_{team}_" for year in YEARS for org in ORGS for team in TEAMS]
+    rng.shuffle(prefixes)
+
+    conventions = {}
+    kinds = [kind for kind, _ in CONVENTION_MIX]
+    weights = [weight for _, weight in CONVENTION_MIX]
+    for index in range(num_conventions):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'prefix' and prefixes:
+            convention = prefixes.pop() + '*'
+        elif kind == 'exact' and users:
+            convention = rng.choice(users)['profile']['real_name']
+        elif kind == 'infix':
+            convention = f"{rng.choice(YEARS)}_*_{rng.choice(TEAMS)}_{rng.choice(PEOPLE)}*"
+        else:
+            convention = f"*_{rng.choice(PEOPLE)}{rng.randrange(max(len(users), 1))}"
+        conventions[f"C{index:07d}"] = convention
+    return conventions
+
+
+def generate_channels(conventions, users, rng, initial_members=5):
+    """컨벤션마다 채널을 만들고, 봇과 무작위 사용자 몇 명을 기존 멤버로 넣습니다."""
+    channels = {}
+    for channel_id, convention in conventions.items():
+        members = {'UBOT0000'}
+        members.update(rng.choice(users)['id'] for _ in range(min(initial_members, len(users))))
+        name = convention.replace('*', '').strip('_').lower() or channel_id.lower()
+        channels[channel_id] = {'name': name, 'members': members}
+    return channels
+
+
+def generate_workspace(num_users=100_000, num_conventions=10_000, seed=0):
+    """
+    가상 워크스페이스를 만듭니다.
+    반환값: (users, conventions, channels)
+    """
+    rng = random.Random(seed)
+    users = generate_users(num_users, rng)
+    conventions = generate_conventions(num_conventions, users, rng)
+    channels = generate_channels(conventions, users, rng)
+    return users, conventions, channels
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from tracing import trace, increment
+
+# 환경 변수
+SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
+SLACK_API_BASE_URL = os.environ.get('SLACK_API_BASE_URL', 'https://slack.com/api/')
+# 연결/응답 대기 시간 (초). 지정하지 않으면 요청이 Lambda 타임아웃까지 멈출 수 있음
+SLACK_CONNECT_TIMEOUT = float(os.environ.get('SLACK_CONNECT_TIMEOUT', '3.05'))
+SLACK_READ_TIMEOUT = float(os.environ.get('SLACK_READ_TIMEOUT', '10'))
+# slack.com 으로 유지하는 keep-alive 연결 수 (초대 스레드 수 이상으로 설정)
+SLACK_POOL_SIZE = int(os.environ.get('SLACK_POOL_SIZE', '16'))
+# 지연 응답(response_url)을 보낼 수 있는 호스트
+RESPONSE_URL_HOST = 'hooks.slack.com'
+# 429 응답을 받았을 때 같은 요청을 다시 시도하는 최대 횟수
+SLACK_MAX_RETRIES = int(os.environ.get('SLACK_MAX_RETRIES', '5'))
+
+# 웜 컨테이너에서 재사용하는 HTTP 세션
+_session = None
+_session_lock = threading.Lock()
+
+class TokenBucket:
+    """
+    스레드 간에 공유되는 토큰 버킷 속도 제한기입니다.
+    429 응답을 받으면 Retry-After 동안 요청을 멈추고 속도를 절반으로 줄이며,
+    이후 성공할 때마다 원래 속도까지 조금씩 회복합니다.
+    """
+
+    def __init__(self, rate_per_second, capacity):
+        self.max_rate = rate_per_second
+        self.min_rate = rate_per_second / 16
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """토큰을 하나 얻을 때까지 대기합니다."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_rate_limited(self, retry_after):
+        """429 응답을 받았을 때 호출합니다."""
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = max(now, self.blocked_until)
+
+    def on_success(self):
+        """요청이 성공했을 때 호출합니다."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+def get_session():
+    """
+    Slack API 호출에 사용하는 공용 requests 세션을 반환합니다.
+    연결 풀을 유지하므로 웜 컨테이너에서는 TCP/TLS 연결을 다시 맺지 않습니다.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # requests는 가져오는 데 시간이 걸리므로 Slack API를 처음 호출할 때 가져옴
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+
+                # 연결 실패만 짧게 재시도 (응답을 받은 요청은 다시 보내지 않음)
+                retry = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2)
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=SLACK_POOL_SIZE,
+                    max_retries=retry
+                )
+                session.mount('https://', adapter)
+
+                session.headers.update({
+                    'Authorization': f'Bearer {SLACK_BOT_TOKEN}',
+                    'Accept-Encoding': 'gzip, deflate'
+                })
+                _session = session
+    return _session
+
+def set_session(session):
+    """
+    Slack API 호출에 사용할 세션을 교체합니다.
+    시뮬레이션에서 실제 Slack 대신 로컬 가짜 API(simulation.fake_slack)를 사용할 때 호출합니다.
+    """
+    global _session
+    with _session_lock:
+        _session = session
+
+def call_api(method, params=None, json_body=None, rate_limiter=None):
+    """
+    Slack Web API를 호출하고 응답 JSON을 반환합니다.
+    json_body가 있으면 POST, 없으면 GET으로 호출합니다.
+    429 응답을 받으면 Retry-After 후 다시 시도하며, 재시도 횟수를 모두 쓰면
+    {'ok': False, 'error': 'ratelimited'}를 반환합니다.
+    """
+    session = get_session()
+    url = SLACK_API_BASE_URL + method
+    timeout = (SLACK_CONNECT_TIMEOUT, SLACK_READ_TIMEOUT)
+
+    for attempt in range(SLACK_MAX_RETRIES + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        if attempt:
+            increment('slack.retries')
+        increment('slack.calls')
+        increment(f"slack.{method}.calls")
+        with trace(f"slack.{method}"):
+            if json_body is not None:
+                response = session.post(url, params=params, json=json_body, timeout=timeout)
+            else:
+                response = session.get(url, params=params, timeout=timeout)
+
+        # Rate limit에 걸린 경우 Retry-After 동안 대기 후 재시도
+        if response.status_code == 429:
+            increment('slack.ratelimited')
+            retry_after = float(response.headers.get('Retry-After', '1'))
+            print(f"Rate limited on {method}, retrying after {retry_after}s")
+            if rate_limiter is not None:
+                rate_limiter.on_rate_limited(retry_after)
+            else:
+                time.sleep(retry_after)
+            continue
+
+        if rate_limiter is not None:
+            rate_limiter.on_success()
+        return response.json()
+
+    print(f"Rate limit retries exhausted on {method}")
+    return {'ok': False, 'error': 'ratelimited'}
+
+def is_slack_response_url(response_url):
+    """Slack이 발급한 response_url(https://hooks.slack.com/...)인지 확인합니다."""
+    try:
+        parts = urlsplit(response_url or '')
+        return (parts.scheme == 'https' and parts.hostname == RESPONSE_URL_HOST
+                and parts.port is None and parts.username is None)
+    except ValueError:
+        return False
+
+def post_response_url(response_url, payload):
+    """
+    슬래시 명령어의 response_url로 지연 응답을 보냅니다.
+    3초 안에 응답하지 못하는 작업의 결과를 나중에 채널에 표시할 때 사용합니다.
+    response_url은 요청 본문에서 온 값이므로 Slack 주소만 허용하고, 봇 토큰 헤더는 보내지 않습니다.
+    """
+    if not is_slack_response_url(response_url):
+        print(f"Refusing to post to non-Slack response_url: {response_url}")
+        return False
+
+    session = get_session()
+    timeout = (SLACK_CONNECT_TIMEOUT, SLACK_READ_TIMEOUT)
+
+    increment('slack.calls')
+    with trace('slack.response_url'):
+        # 세션 기본 헤더의 Authorization을 None으로 덮어써 이 요청에서만 제외
+        response = session.post(response_url, json=payload, timeout=timeout, headers={'Authorization': None})
+    if response.status_code != 200:
+        print(f"Failed to post to response_url: {response.status_code}")
+        return False
+    return True
@@ -1,35 +1,115 @@
 import json
-import boto3
-import re
 import base64
-import requests
 from urllib.parse import parse_qs
+from slack_client import call_api
+from convention_store import get_table, match_conventions
+from user_state import get_user_state_table, get_user_state, record_user_name, add_granted_channels
+from member_snapshot import get_snapshot_table, upsert_member
+from channel_membership import get_membership_table, add_members, remove_members
+from event_dedup import claim_event, release_event
+from event_queue import QUEUED_EVENT_TYPES, is_queue_enabled, enqueue_event, parse_queue_records, coalesce_events
+from tracing import trace, traced, traced_handler
 
-# 환경 변수에서 Slack 토큰 가져오기
-SLACK_BOT_TOKEN = os.environ['SLACK_BOT_TOKEN']
-
+@traced_handler
 def lambda_handler(event, context):
-    # 이벤트 로깅
-    print(f"Received event: {json.dumps(event)}")
-    
-    # 이벤트 파싱
-    body = parse_slack_event(event)
+    # 이벤트 파싱 (이벤트 전체 로그는 traced_handler에서 샘플링하여 남김)
+    with trace('parse'):
+        body = parse_slack_event(event)
     
     # 이벤트 타입 확인
     event_type = body.get('event', {}).get('type')
     
-    # DynamoDB 클라이언트 생성
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table('slack-invitor')
+    # 드라이런: 중복 확인/큐/상태 기록/초대 없이 초대할 채널만 계산
+    if event.get('dry_run'):
+        return plan_event(body)
+    
+    # Slack이 다시 보낸 이벤트(X-Slack-Retry-Num)는 다른 I/O 전에 event_id로 걸러냄
+    event_id = body.get('event_id')
+    if not claim_event(event_id):
+        print(f"Duplicate event dropped: {event_id} (retry {get_retry_num(event)})")
+        return {
+            'statusCode': 200,
+            'body': json.dumps('Duplicate event')
+        }
+    
+    # 큐가 설정되어 있으면 Slack의 3초 응답 제한 안에 큐에 넣기만 하고 바로 응답
+    if is_queue_enabled():
+        if event_type not in QUEUED_EVENT_TYPES:
+            print(f"Unsupported event type: {event_type}")
+            return {
+                'statusCode': 200,
+                'body': json.dumps('Event received')
+            }
+        
+        try:
+            enqueue_event(body)
+        except Exception as e:
+            # 실패하면 Slack이 같은 이벤트를 다시 보내도록 오류로 응답
+            print(f"Error enqueueing event: {str(e)}")
+            release_event(event_id)
+            return {
+                'statusCode': 500,
+                'body': json.dumps({'error': str(e)})
+            }
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps('Event queued')
+        }
+    
+    result = process_event(body)
+    if result.get('statusCode', 200) >= 500:
+        release_event(event_id)
+    return result
+
+def get_retry_num(event):
+    """Slack 재전송 횟수 헤더(X-Slack-Retry-Num)를 반환합니다. 첫 전송이면 None입니다."""
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == 'x-slack-retry-num':
+            return value
+    return None
+
+@traced_handler
+def worker_handler(event, context):
+    """
+    SQS 큐에 쌓인 Slack 이벤트를 배치로 처리합니다.
+    같은 사용자에 대한 이벤트는 가장 최근 이벤트 하나로 합쳐서 처리하고,
+    처리에 실패한 메시지만 batchItemFailures로 반환하여 다시 시도하게 합니다.
+    """
+    messages = parse_queue_records(event)
+    coalesced = coalesce_events(messages)
+    print(f"Processing {len(coalesced)} events coalesced from {len(messages)} queued messages")
+    
+    failures = []
+    for body, message_ids in coalesced:
+        result = process_event(body)
+        if result.get('statusCode', 200) >= 500:
+            failures.extend(message_ids)
+    
+    return {
+        'batchItemFailures': [
+            {'itemIdentifier': message_id}
+            for message_id in failures
+        ]
+    }
+
+def process_event(body):
+    """파싱된 Slack 이벤트를 타입에 맞는 핸들러로 처리합니다."""
+    event_type = body.get('event', {}).get('type')
     
     try:
-        # 새 사용자 참여 이벤트 처리
+        # 새 사용자 참여 이벤트 처리 (DynamoDB 테이블은 필요한 이벤트에서만 가져오고 웜 컨테이너에서 재사용)
         if event_type == 'team_join':
-            return handle_team_join(body, table)
+            return handle_team_join(body, get_table())
         
         # 사용자 프로필 변경 이벤트 처리
         elif event_type == 'user_change':
-            return handle_user_change(body, table)
+            return handle_user_change(body, get_table())
+        
+        # 채널 입장/퇴장 이벤트로 멤버십 캐시 갱신
+        elif event_type in ('member_joined_channel', 'member_left_channel'):
+            return handle_membership_change(body)
         
         # 지원되지 않는 이벤트 타입
         else:
@@ -46,6 +126,38 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
+def plan_event(body):
+    """
+    이벤트를 처리했다면 초대했을 채널 목록을 계산합니다. 상태 테이블과 Slack에는 쓰지 않습니다.
+    """
+    event_type = body.get('event', {}).get('type')
+    planned_channels = []
+    
+    if event_type in ('team_join', 'user_change'):
+        user = body.get('event', {}).get('user', {})
+        user_id = user.get('id')
+        profile = user.get('profile', {})
+        user_name = profile.get('display_name', '') or profile.get('real_name', '')
+        
+        state = get_user_state(get_user_state_table(), user_id)
+        # 이름이 바뀌지 않은 이벤트는 실제 처리에서도 건너뜀
+        if 'user_name' not in state or state['user_name'] != user_name:
+            granted_channels = state.get('granted_channels') or set()
+            planned_channels = [
+                channel_id
+                for channel_id in match_conventions(get_table(), user_name)
+                if channel_id not in granted_channels
+            ]
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'dry_run': True,
+            'event_type': event_type,
+            'planned_channels': sorted(planned_channels)
+        })
+    }
+
 def parse_slack_event(event):
     """Slack 이벤트를 파싱합니다."""
     try:
@@ -88,8 +200,24 @@ def handle_team_join(body, table):
     
     print(f"New user joined: {user_name} (ID: {user_id})")
     
+    # 이름이 바뀌지 않은 이벤트(상태 이모지, 프로필 사진 변경 등)는 컨벤션 조회 전에 무시
+    # (이름은 초대를 마친 뒤에 기록하므로, 처리 중 실패한 이벤트는 다시 전달되면 처음부터 처리됨)
+    state = get_user_state(get_user_state_table(), user_id)
+    name_changed = state.get('user_name') != user_name
+    
+    # 이름이 바뀌었거나 비활성화된 경우 일괄 초대용 멤버 스냅샷 갱신
+    if name_changed or user.get('deleted', False):
+        upsert_member(get_snapshot_table(), user)
+    
+    if not name_changed:
+        print(f"User name unchanged, skipping: {user_name} (ID: {user_id})")
+        return {
+            'statusCode': 200,
+            'body': json.dumps('User unchanged')
+        }
+    
     # 모든 채널 컨벤션 가져오기
-    return check_and_invite_user(user_id, user_name, table)
+    return check_and_invite_user(user_id, user_name, table, state.get('granted_channels'), state.get('user_name'))
 
 def handle_user_change(body, table):
     """사용자 프로필 변경 이벤트를 처리합니다."""
@@ -103,38 +231,71 @@ def handle_user_change(body, table):
     
     print(f"User profile changed: {user_name} (ID: {user_id})")
     
+    # 이름이 바뀌지 않은 이벤트(상태 이모지, 프로필 사진 변경 등)는 컨벤션 조회 전에 무시
+    # (이름은 초대를 마친 뒤에 기록하므로, 처리 중 실패한 이벤트는 다시 전달되면 처음부터 처리됨)
+    state = get_user_state(get_user_state_table(), user_id)
+    name_changed = state.get('user_name') != user_name
+    
+    # 이름이 바뀌었거나 비활성화된 경우 일괄 초대용 멤버 스냅샷 갱신
+    if name_changed or user.get('deleted', False):
+        upsert_member(get_snapshot_table(), user)
+    
+    if not name_changed:
+        print(f"User name unchanged, skipping: {user_name} (ID: {user_id})")
+        return {
+            'statusCode': 200,
+            'body': json.dumps('User unchanged')
+        }
+    
     # 모든 채널 컨벤션 가져오기
-    return check_and_invite_user(user_id, user_name, table)
+    return check_and_invite_user(user_id, user_name, table, state.get('granted_channels'), state.get('user_name'))
+
+def handle_membership_change(body):
+    """채널 입장/퇴장 이벤트를 일괄 초대용 채널 멤버십 캐시에 반영합니다."""
+    event = body.get('event', {})
+    user_id = event.get('user')
+    channel_id = event.get('channel')
+    
+    if event.get('type') == 'member_joined_channel':
+        add_members(get_membership_table(), channel_id, [user_id])
+    else:
+        remove_members(get_membership_table(), channel_id, [user_id])
+    
+    print(f"Membership updated: {event.get('type')} {user_id} in {channel_id}")
+    return {
+        'statusCode': 200,
+        'body': json.dumps('Membership updated')
+    }
 
-def check_and_invite_user(user_id, user_name, table):
-    """사용자 이름이 컨벤션과 일치하는지 확인하고 채널에 초대합니다."""
+def check_and_invite_user(user_id, user_name, table, granted_channels=None, previous_name=None):
+    """
+    사용자 이름이 컨벤션과 일치하는지 확인하고 채널에 초대합니다.
+    이미 초대된 채널(granted_channels)은 건너뛰고, 새로 일치하는 채널에만 초대합니다.
+    모든 초대가 성공하면 마지막에 이름을 기록합니다 (previous_name은 상태에서 읽었던 이름).
+    """
+    user_state_table = get_user_state_table()
+    granted_channels = granted_channels or set()
+    
     try:
-        # 모든 채널 컨벤션 가져오기
-        response = table.scan()
-        conventions = response.get('Items', [])
-        
+        # 캐시된 컨벤션으로 매칭 (컨벤션 버전이 바뀐 경우에만 다시 읽어옴)
         invited_channels = []
-        
-        # 각 컨벤션 확인
-        for convention in conventions:
-            channel_id = convention.get('channel_id')
-            name_convention = convention.get('name_convention', '')
+        failed_channels = []
+        for channel_id in match_conventions(table, user_name):
+            if channel_id in granted_channels:
+                continue
             
-            # 와일드카드를 정규식으로 변환
-            if '*' in name_convention:
-                # *를 정규식 .*로 변환 (임의의 문자열과 매칭)
-                pattern = name_convention.replace('*', '.*')
-                if re.match(f"^{pattern}$", user_name):
-                    # 컨벤션과 일치하면 채널에 초대
-                    invite_result = invite_user_to_channel(user_id, channel_id)
-                    if invite_result:
-                        invited_channels.append(channel_id)
+            invite_result = invite_user_to_channel(user_id, channel_id)
+            if invite_result:
+                invited_channels.append(channel_id)
             else:
-                # 정확히 일치하는지 확인
-                if user_name == name_convention:
-                    invite_result = invite_user_to_channel(user_id, channel_id)
-                    if invite_result:
-                        invited_channels.append(channel_id)
+                failed_channels.append(channel_id)
+        
+        # 초대된 채널 기록
+        add_granted_channels(user_state_table, user_id, invited_channels)
+        
+        # 모든 초대가 성공한 경우에만 이름 기록 (실패한 채널은 같은 이름의 다음 이벤트에서 다시 시도)
+        if not failed_channels:
+            record_user_name(user_state_table, user_id, user_name, previous_name)
         
         if invited_channels:
             print(f"User {user_name} invited to channels: {', '.join(invited_channels)}")
@@ -153,21 +314,16 @@ def check_and_invite_user(user_id, user_name, table):
             'body': json.dumps({'error': str(e)})
         }
 
+@traced('invite')
 def invite_user_to_channel(user_id, channel_id):
     """Slack API를 사용하여 사용자를 채널에 초대합니다."""
     try:
-        url = "https://slack.com/api/conversations.invite"
-        headers = {
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json"
-        }
         payload = {
             "channel": channel_id,
             "users": user_id
         }
         
-        response = requests.post(url, headers=headers, json=payload)
-        result = response.json()
+        result = call_api('conversations.invite', json_body=payload)
         
         if result.get('ok'):
             print(f"Successfully invited user {user_id} to channel {channel_id}")
@@ -1,12 +1,59 @@
+import re
+import csv
 import json
-import boto3
 import datetime
 import base64
+from io import StringIO
 from urllib.parse import parse_qs, unquote
+from convention_store import (
+    get_table, bump_convention_version, prefix_bucket, backfill_prefix_buckets, export_conventions, import_conventions
+)
+from convention_index import convention_includes
+from convention_pattern import PatternError, parse_convention
+from aws_clients import get_client
+from tracing import trace, traced_handler
 
+# 채널 ID 또는 Slack 채널 링크(<#C0123|이름>)
+CHANNEL_ID_PATTERN = re.compile(r'^(?:([CG][A-Z0-9]+)|<#([CG][A-Z0-9]+)(?:\|[^>]*)?>)$')
+
+# 일괄 가져오기/내보내기 CSV 헤더
+CSV_HEADER = ('channel_id', 'name_convention')
+
+@traced_handler
 def lambda_handler(event, context):
+    # 관리용 직접 호출: 기존 컨벤션 항목에 prefix_bucket 속성 채우기
+    if event.get('backfill_prefix_buckets'):
+        updated = backfill_prefix_buckets(get_table())
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'updated': updated})
+        }
+    
+    # 관리용 직접 호출: 컨벤션 일괄 가져오기 (JSON 객체/배열 또는 CSV 문자열)
+    if 'import_conventions' in event:
+        result = import_convention_mapping(event['import_conventions'], bool(event.get('dry_run')))
+        return {
+            'statusCode': 200 if result['ok'] else 400,
+            'body': json.dumps(result, ensure_ascii=False)
+        }
+    
+    # 관리용 직접 호출: 컨벤션 일괄 내보내기
+    if event.get('export_conventions'):
+        conventions = export_conventions(get_table())
+        if event.get('format') == 'csv':
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'text/csv; charset=utf-8'},
+                'body': format_conventions_csv(conventions)
+            }
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'conventions': conventions}, ensure_ascii=False)
+        }
+    
     # 슬랙에서 전송된 요청 파싱
-    body = parse_slack_request(event)
+    with trace('parse'):
+        body = parse_slack_request(event)
     
     # 슬래시 명령어 검증
     if body.get('command') != '/set-convention':
@@ -23,33 +70,28 @@ def lambda_handler(event, context):
     channel_id = body.get('channel_id')
     name_convention = body.get('text', '').strip()
     
-    # DynamoDB 클라이언트 생성
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table('slack-invitor')
-    
-    # Lambda 클라이언트 생성 (비동기 호출용)
-    lambda_client = boto3.client('lambda')
-    
     # 현재 날짜 및 시간 생성 (시간, 분, 초 포함)
     current_datetime = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     try:
         # 컨벤션 텍스트가 비어있는지 확인 - 비어있으면 컨벤션 삭제
         if not name_convention:
-            # 채널 ID로 기존 항목 조회
-            response = table.get_item(
+            # DynamoDB 테이블 (웜 컨테이너에서 재사용)
+            table = get_table()
+            
+            # 조회 없이 한 번의 삭제 요청으로 삭제하고, 항목이 있었는지는 삭제 전 항목(ALL_OLD)으로 확인
+            response = table.delete_item(
                 Key={
                     'channel_id': channel_id
-                }
+                },
+                ReturnValues='ALL_OLD'
             )
             
-            # 항목이 존재하는 경우 삭제
-            if 'Item' in response:
-                table.delete_item(
-                    Key={
-                        'channel_id': channel_id
-                    }
-                )
+            # 항목이 존재했던 경우
+            if 'Attributes' in response:
+                
+                # 이벤트 처리 람다의 컨벤션 캐시 무효화
+                bump_convention_version(table)
                 return {
                     'statusCode': 200,
                     'headers': {'Content-Type': 'application/json'},
@@ -79,50 +121,78 @@ def lambda_handler(event, context):
                 })
             }
         
-        # 채널 ID로 기존 항목 조회
-        response = table.get_item(
+        # 컨벤션 문법 검사 및 컴파일 (컴파일 결과를 함께 저장하여 이벤트 처리 람다에서 다시 파싱하지 않음)
+        try:
+            pattern = parse_convention(name_convention)
+        except PatternError as e:
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({
+                    'response_type': 'ephemeral',
+                    'text': f'이름 컨벤션 문법이 올바르지 않습니다: {str(e)}. 예: `/set-convention 2025_{{A,B}}반_*`'
+                })
+            }
+        compiled_convention = pattern.to_json()
+        
+        # 입력 검사를 통과한 뒤에만 DynamoDB 테이블을 가져옴 (웜 컨테이너에서 재사용)
+        table = get_table()
+        
+        # 조회 없이 한 번의 쓰기로 생성/변경하고, 기존 항목이 있었는지는 쓰기 전 항목(ALL_OLD)으로 확인
+        # 변경 전 컨벤션을 함께 저장하여 변경분만 초대할 수 있도록 함 (새 항목이면 빈 문자열)
+        response = table.update_item(
             Key={
                 'channel_id': channel_id
-            }
+            },
+            UpdateExpression=(
+                'SET name_convention = :nc, compiled_convention = :cc, prefix_bucket = :pb, '
+                'previous_convention = if_not_exists(name_convention, :empty), '
+                'created_date = if_not_exists(created_date, :ud), updated_date = :ud'
+            ),
+            ExpressionAttributeValues={
+                ':nc': name_convention,
+                ':cc': compiled_convention,
+                ':pb': prefix_bucket(pattern),
+                ':empty': '',
+                ':ud': current_datetime
+            },
+            ReturnValues='ALL_OLD'
         )
         
-        # 항목이 이미 존재하는 경우 업데이트
-        if 'Item' in response:
-            update_response = table.update_item(
-                Key={
-                    'channel_id': channel_id
-                },
-                UpdateExpression='SET name_convention = :nc, updated_date = :ud',
-                ExpressionAttributeValues={
-                    ':nc': name_convention,
-                    ':ud': current_datetime
-                },
-                ReturnValues='UPDATED_NEW'
-            )
+        # 이벤트 처리 람다의 컨벤션 캐시 무효화
+        bump_convention_version(table)
+        
+        # 항목이 이미 존재했던 경우 (업데이트)
+        if 'Attributes' in response:
+            previous_convention = response['Attributes'].get('name_convention', '')
             
-            # 비동기로 초대 람다 함수 호출
-            invoke_invite_lambda(lambda_client, channel_id, name_convention)
+            # 새 컨벤션이 기존 컨벤션에 포함되면 (예: 2025_* → 2025_A*) 새로 초대할 사용자가 없음
+            if previous_convention and convention_includes(previous_convention, name_convention):
+                print(f"Convention {name_convention} is a subset of {previous_convention}, skipping backfill")
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({
+                        'response_type': 'in_channel',
+                        'text': f'이 채널의 이름 컨벤션이 `{name_convention}`으로 업데이트되었습니다. 기존 컨벤션 `{previous_convention}`에 포함되는 패턴이므로 추가 초대는 필요하지 않습니다.'
+                    })
+                }
+            
+            # 비동기로 초대 람다 함수 호출 (기존 컨벤션과 일치하지 않던 사용자만 대상)
+            invoke_invite_lambda(get_client('lambda'), channel_id, name_convention, previous_convention)
             
             return {
                 'statusCode': 200,
                 'headers': {'Content-Type': 'application/json'},
                 'body': json.dumps({
                     'response_type': 'in_channel',
-                    'text': f'이 채널의 이름 컨벤션이 `{name_convention}`으로 업데이트되었습니다. 모든 사용자 초대가 백그라운드에서 진행됩니다.'
+                    'text': f'이 채널의 이름 컨벤션이 `{name_convention}`으로 업데이트되었습니다. 새로 일치하는 사용자 초대가 백그라운드에서 진행됩니다.'
                 })
             }
-        # 항목이 존재하지 않는 경우 새로 생성
+        # 항목이 존재하지 않았던 경우 (새로 생성)
         else:
-            table.put_item(
-                Item={
-                    'channel_id': channel_id,
-                    'name_convention': name_convention,
-                    'created_date': current_datetime
-                }
-            )
-            
             # 비동기로 초대 람다 함수 호출
-            invoke_invite_lambda(lambda_client, channel_id, name_convention)
+            invoke_invite_lambda(get_client('lambda'), channel_id, name_convention)
             
             return {
                 'statusCode': 200,
@@ -144,9 +214,10 @@ def lambda_handler(event, context):
             })
         }
 
-def invoke_invite_lambda(lambda_client, channel_id, name_convention):
+def invoke_invite_lambda(lambda_client, channel_id, name_convention, previous_convention=None):
     """
     비동기적으로 사용자 초대 람다 함수를 호출합니다.
+    previous_convention이 있으면 기존 컨벤션과 일치하던 사용자는 초대 대상에서 제외됩니다.
     """
     try:
         # 초대 람다 함수에 전달할 페이로드
@@ -154,6 +225,8 @@ def invoke_invite_lambda(lambda_client, channel_id, name_convention):
             'channel_id': channel_id,
             'name_convention': name_convention
         }
+        if previous_convention:
+            payload['previous_convention'] = previous_convention
         
         # 비동기 호출 (InvocationType='Event')
         response = lambda_client.invoke(
@@ -168,6 +241,146 @@ def invoke_invite_lambda(lambda_client, channel_id, name_convention):
         print(f"Error invoking invite lambda: {str(e)}")
         return False
 
+def invoke_bulk_invite_lambda(lambda_client, conventions, excluded_conventions):
+    """
+    일괄 가져오기로 저장한 여러 채널의 초대를 하나의 초대 작업(한 번의 멤버 크롤링)으로 요청합니다.
+    excluded_conventions({channel_id: 변경 전 컨벤션})에 일치하던 사용자는 해당 채널의 초대 대상에서 제외됩니다.
+    """
+    try:
+        response = lambda_client.invoke(
+            FunctionName='slack_invitor_invite_all',
+            InvocationType='Event',
+            Payload=json.dumps({
+                'conventions': conventions,
+                'excluded_conventions': excluded_conventions
+            }, ensure_ascii=False)
+        )
+        
+        print(f"Bulk invite lambda invoked for {len(conventions)} channels: {response}")
+        return True
+    except Exception as e:
+        print(f"Error invoking bulk invite lambda: {str(e)}")
+        return False
+
+def parse_channel_id(text):
+    """채널 ID 또는 Slack 채널 링크(<#C0123|이름>)에서 채널 ID를 꺼냅니다. 형식이 다르면 None을 반환합니다."""
+    match = CHANNEL_ID_PATTERN.match(text.strip())
+    if not match:
+        return None
+    return match.group(1) or match.group(2)
+
+def parse_convention_mapping(data):
+    """
+    일괄 가져오기 입력을 [(항목 번호, 채널, 컨벤션)] 목록으로 변환합니다.
+    - JSON 객체: {"C0123": "2025_A반_*", ...}
+    - JSON 배열: [{"channel_id": "C0123", "name_convention": "2025_A반_*"}, ...]
+    - CSV: 공백이나 줄바꿈으로 구분한 `채널,컨벤션` 항목 (첫 항목이 channel_id,name_convention 헤더이면 건너뜀)
+    컨벤션을 비워 두면(`C0123,`) 해당 채널의 컨벤션을 삭제합니다.
+    """
+    if isinstance(data, str) and data.strip()[:1] in ('{', '['):
+        data = json.loads(data)
+
+    if isinstance(data, dict):
+        return [(number, channel, convention) for number, (channel, convention) in enumerate(data.items(), 1)]
+
+    if isinstance(data, list):
+        return [
+            (number, entry.get('channel_id', ''), entry.get('name_convention', ''))
+            for number, entry in enumerate(data, 1)
+        ]
+
+    entries = []
+    # 컨벤션과 채널에는 공백이 없으므로 공백 단위로 항목을 나누고, `{a,b}`의 쉼표는 채널 뒤 나머지를 다시 합쳐 유지
+    for number, token in enumerate(str(data or '').split(), 1):
+        row = next(csv.reader([token]))
+        if number == 1 and tuple(row) == CSV_HEADER:
+            continue
+        entries.append((number, row[0] if row else '', ','.join(row[1:])))
+    return entries
+
+def validate_convention_mapping(entries):
+    """
+    가져올 항목의 채널과 컨벤션 문법을 검사합니다.
+    반환값: ({channel_id: Pattern 또는 None(삭제)}, 오류 메시지 목록)
+    """
+    patterns = {}
+    errors = []
+    for number, channel, convention in entries:
+        channel_id = parse_channel_id(str(channel or ''))
+        convention = str(convention or '').strip()
+
+        if not channel_id:
+            errors.append(f"{number}번째 항목: 채널 `{channel}`을 알 수 없습니다. 채널 ID(C0123) 또는 채널 링크를 사용하세요")
+            continue
+        if channel_id in patterns:
+            errors.append(f"{number}번째 항목: 채널 {channel_id}이 여러 번 나옵니다")
+            continue
+        if not convention:
+            patterns[channel_id] = None
+            continue
+        if ' ' in convention:
+            errors.append(f"{number}번째 항목: 컨벤션에 띄어쓰기를 사용할 수 없습니다")
+            continue
+        try:
+            patterns[channel_id] = parse_convention(convention)
+        except PatternError as e:
+            errors.append(f"{number}번째 항목: `{convention}` 문법이 올바르지 않습니다: {str(e)}")
+    return patterns, errors
+
+def import_convention_mapping(data, dry_run=False):
+    """
+    여러 채널의 컨벤션을 한 번에 저장하고 초대를 하나의 작업으로 요청합니다.
+    항목 하나라도 잘못되었으면 아무것도 저장하지 않습니다.
+    새로 설정된 채널은 전체 초대, 변경된 채널은 변경 전 컨벤션과 일치하지 않던 사용자만 초대하며,
+    새 컨벤션이 변경 전 컨벤션에 포함되는 채널은 초대 대상에서 뺍니다.
+    dry_run이면 저장과 초대 요청 없이 변경 내용만 계산합니다.
+    """
+    try:
+        entries = parse_convention_mapping(data)
+    except (ValueError, AttributeError) as e:
+        return {'ok': False, 'errors': [f"입력을 읽을 수 없습니다: {str(e)}"]}
+
+    patterns, errors = validate_convention_mapping(entries)
+    if not errors and not patterns:
+        errors.append('가져올 컨벤션이 없습니다')
+    if errors:
+        return {'ok': False, 'errors': errors}
+
+    current_datetime = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    changes = import_conventions(get_table(), patterns, current_datetime, dry_run)
+
+    # 하나의 초대 작업으로 보낼 채널별 컨벤션과 변경 전 컨벤션
+    conventions = dict(changes['created'])
+    excluded_conventions = {}
+    for channel_id, (previous_convention, name_convention) in changes['updated'].items():
+        if convention_includes(previous_convention, name_convention):
+            continue
+        conventions[channel_id] = name_convention
+        excluded_conventions[channel_id] = previous_convention
+
+    invite_requested = False
+    if conventions and not dry_run:
+        invite_requested = invoke_bulk_invite_lambda(get_client('lambda'), conventions, excluded_conventions)
+
+    return {
+        'ok': True,
+        'dry_run': dry_run,
+        'created': sorted(changes['created']),
+        'updated': sorted(changes['updated']),
+        'deleted': sorted(changes['deleted']),
+        'unchanged': sorted(changes['unchanged']),
+        'invite_channels': sorted(conventions),
+        'invite_requested': invite_requested
+    }
+
+def format_conventions_csv(conventions):
+    """{channel_id: 컨벤션}을 import_conventions로 다시 가져올 수 있는 CSV로 만듭니다."""
+    output = StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(CSV_HEADER)
+    writer.writerows(conventions.items())
+    return output.getvalue()
+
 def parse_slack_request(event):
     """
     Slack에서 전송된 요청을 파싱합니다.
@@ -175,16 +388,12 @@ def parse_slack_request(event):
     Base64로 인코딩된 본문을 디코딩하고 URL 인코딩된 폼 데이터를 파싱합니다.
     """
     try:
-        # 이벤트 로깅 (디버깅용)
-        print(f"Received event: {json.dumps(event)}")
-        
         if 'body' in event:
             body_str = event['body']
             
             # Base64로 인코딩된 경우 디코딩
             if event.get('isBase64Encoded', False):
                 body_str = base64.b64decode(body_str).decode('utf-8')
-                print(f"Decoded body: {body_str}")
             
             # URL 인코딩된 폼 데이터 파싱
             parsed_body = parse_qs(body_str)
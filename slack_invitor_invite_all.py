@@ -1,19 +1,105 @@
 import json
-import boto3
 import os
-import re
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from invite_job import create_job, load_job, save_job, has_time_left, check_time_budget, continue_job_async
+from slack_client import TokenBucket, call_api
+from convention_index import ConventionIndex
+from tracing import traced, traced_handler
+from convention_store import get_table, scan_conventions
+from channel_membership import get_membership_table, get_cached_members, store_members, add_members
+from member_snapshot import (
+    MEMBER_SNAPSHOT_MAX_AGE, MEMBER_SNAPSHOT_DIFF_MAX_AGE, get_snapshot_table, is_snapshot_fresh, mark_snapshot_refreshed,
+    write_member_records, scan_member_page, to_member_record, is_active_record
+)
 
-# 환경 변수에서 Slack 토큰 가져오기
-SLACK_BOT_TOKEN = os.environ['SLACK_BOT_TOKEN']
+# conversations.invite 속도 제한 (Slack Tier 3: 분당 50회 이상, 짧은 버스트 허용)
+SLACK_INVITE_RATE_PER_MINUTE = float(os.environ.get('SLACK_INVITE_RATE_PER_MINUTE', '50'))
+SLACK_INVITE_BURST = int(os.environ.get('SLACK_INVITE_BURST', '5'))
+# 한 번의 conversations.invite 요청에 담는 최대 사용자 수 (Slack 최대 1000)
+INVITE_BATCH_SIZE = min(int(os.environ.get('INVITE_BATCH_SIZE', '1000')), 1000)
+# 채널별 초대 대상이 이 수만큼 모이면 요청을 보냄 (크롤링이 끝나면 남은 대상도 모두 보냄)
+INVITE_FLUSH_SIZE = min(int(os.environ.get('INVITE_FLUSH_SIZE', '100')), INVITE_BATCH_SIZE)
+# 동시에 초대 요청을 보내는 스레드 수
+INVITE_CONCURRENCY = int(os.environ.get('INVITE_CONCURRENCY', '4'))
+# 남은 초대를 기다리는 동안 실행 시간을 확인하는 간격 (초)
+DRAIN_WAIT_SECONDS = 1
+# users.list / conversations.members 페이지 사이의 대기 시간 (초)
+USERS_LIST_PAGE_DELAY = float(os.environ.get('USERS_LIST_PAGE_DELAY', '1'))
+CHANNEL_MEMBERS_PAGE_DELAY = float(os.environ.get('CHANNEL_MEMBERS_PAGE_DELAY', '0.5'))
 
+# 사용자를 나누어 다시 보내도 성공할 수 없는 채널/인증/속도 제한 오류
+CHANNEL_LEVEL_ERRORS = {
+    'ratelimited',
+    'channel_not_found',
+    'not_in_channel',
+    'is_archived',
+    'method_not_supported_for_channel_type',
+    'restricted_action',
+    'missing_scope',
+    'not_authed',
+    'invalid_auth',
+    'account_inactive',
+    'token_revoked'
+}
+
+# 웜 컨테이너에서 재사용하는 초대 속도 제한기
+invite_rate_limiter = TokenBucket(SLACK_INVITE_RATE_PER_MINUTE / 60, SLACK_INVITE_BURST)
+
+@traced_handler
 def lambda_handler(event, context):
     """
-    채널 ID를 받아 해당 채널의 네이밍 컨벤션을 확인하고,
-    워크스페이스 전체 멤버 중 컨벤션과 일치하는 사용자를 모두 초대하는 함수
+    채널의 네이밍 컨벤션을 확인하고, 워크스페이스 전체 멤버 중 컨벤션과 일치하는 사용자를 모두 초대하는 함수.
+    - {'channel_id': ...}: 한 채널만 처리
+    - {'channel_ids': [...]}: 지정한 여러 채널을 한 번의 멤버 크롤링으로 처리
+    - {'all_channels': true}: 컨벤션이 설정된 모든 채널을 한 번의 멤버 크롤링으로 처리
+    - {'conventions': {channel_id: 컨벤션}, 'excluded_conventions': {channel_id: 변경 전 컨벤션}}:
+      컨벤션 일괄 가져오기에서 저장한 컨벤션을 다시 읽지 않고 한 번의 멤버 크롤링으로 처리
+    - 'dry_run': true를 함께 보내면 초대하지 않고 채널별 초대 계획(인원)만 계산
+    실행 시간이 부족하면 진행 상황을 체크포인트로 저장하고 스스로를 다시 호출하여 이어갑니다.
     """
     try:
+        # 이전 호출에서 넘겨받은 작업이면 체크포인트에서 이어서 실행
+        job_id = event.get('job_id')
+        if job_id:
+            job = load_job(job_id)
+            
+            if not job:
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({
+                        'error': f'작업 {job_id}을 찾을 수 없습니다.'
+                    })
+                }
+            
+            print(f"Resuming job {job_id} for {len(job['conventions'])} channels (phase: {job['phase']})")
+            return run_invite_job(job, context)
+        
+        # 드라이런: Slack 초대와 스냅샷/멤버십 캐시 쓰기 없이 초대 계획만 계산
+        dry_run = bool(event.get('dry_run'))
+        
+        # 컨벤션 일괄 가져오기: 저장한 컨벤션과 변경 전 컨벤션을 그대로 받아 하나의 작업으로 처리
+        if event.get('conventions'):
+            conventions = dict(event['conventions'])
+            excluded_conventions = dict(event.get('excluded_conventions') or {})
+            print(f"Processing {len(conventions)} imported channels ({len(excluded_conventions)} changed)")
+            return start_invite_job(conventions, context, excluded_conventions, dry_run)
+        
+        # 여러 채널을 한 번에 처리하는 경우
+        if event.get('all_channels') or event.get('channel_ids'):
+            conventions = load_conventions(None if event.get('all_channels') else event.get('channel_ids'))
+            
+            if not conventions:
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({
+                        'error': '네이밍 컨벤션이 설정된 채널이 없습니다.'
+                    })
+                }
+            
+            print(f"Processing {len(conventions)} channels")
+            return start_invite_job(conventions, context, dry_run=dry_run)
+        
         # 이벤트에서 채널 ID 추출
         channel_id = event.get('channel_id')
         
@@ -40,29 +126,13 @@ def lambda_handler(event, context):
         
         print(f"Found convention: {convention}")
         
-        # 워크스페이스 멤버 목록 가져오기
-        members = get_workspace_members()
+        # 컨벤션이 변경된 경우 변경 전 컨벤션과 일치하던 사용자는 이미 초대되었으므로 제외
+        previous_convention = event.get('previous_convention')
+        if previous_convention:
+            print(f"Previous convention: {previous_convention} (inviting newly matched members only)")
+            return start_invite_job({channel_id: convention}, context, {channel_id: previous_convention}, dry_run)
         
-        if not members:
-            return {
-                'statusCode': 500,
-                'body': json.dumps({
-                    'error': '워크스페이스 멤버 목록을 가져오는데 실패했습니다.'
-                })
-            }
-        
-        print(f"Found {len(members)} members in workspace")
-        
-        # 컨벤션과 일치하는 멤버 필터링 및 초대
-        invited_count = invite_matching_members(channel_id, convention, members)
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': f'채널 {channel_id}에 {invited_count}명의 사용자가 초대되었습니다.',
-                'invited_count': invited_count
-            })
-        }
+        return start_invite_job({channel_id: convention}, context, dry_run=dry_run)
         
     except Exception as e:
         print(f"Error in lambda_handler: {str(e)}")
@@ -73,13 +143,274 @@ def lambda_handler(event, context):
             })
         }
 
+def start_invite_job(conventions, context, excluded_conventions=None, dry_run=False):
+    """새 일괄 초대 작업을 만들고 실행합니다."""
+    # 멤버 스냅샷이 충분히 최신이면 users.list 크롤링 대신 스냅샷 사용
+    # (모든 채널이 변경분만 초대하는 경우에는 이벤트로 갱신된 더 오래된 스냅샷도 사용)
+    diff_only = bool(excluded_conventions) and all(channel_id in excluded_conventions for channel_id in conventions)
+    max_age = MEMBER_SNAPSHOT_DIFF_MAX_AGE if diff_only else MEMBER_SNAPSHOT_MAX_AGE
+    member_source = 'snapshot' if is_snapshot_fresh(get_snapshot_table(), max_age) else 'slack'
+    print(f"Member source: {member_source}")
+    
+    job = create_job(conventions, member_source, excluded_conventions, dry_run)
+    return run_invite_job(job, context)
+
+def run_invite_job(job, context):
+    """
+    users.list 페이지를 하나씩 가져와 바로 매칭하고 초대하는 스트리밍 파이프라인으로 작업을 진행합니다.
+    모든 채널의 컨벤션을 하나의 인덱스로 합쳐 멤버마다 한 번만 매칭하고, 채널별 초대 계획을 만듭니다.
+    전체 멤버 목록을 메모리에 모으지 않으며, 크롤링이 끝나기 전에 초대가 시작됩니다.
+    페이지마다 체크포인트를 저장하고, 남은 실행 시간이 부족하면 새 호출로 작업을 넘깁니다.
+    채널 멤버는 페이지에서 처음 일치한 채널만 불러오며, 불러오는 중에도 남은 실행 시간을 확인합니다.
+    """
+    # 한 단계도 처리할 수 없는 타임아웃이면 작업을 넘기지 않고 바로 실패
+    check_time_budget(context)
+    
+    job['invocations'] += 1
+    dry_run = job.get('dry_run', False)
+    index = ConventionIndex(job['conventions'].items())
+    excluded_index = ConventionIndex(job.get('excluded_conventions', {}).items())
+    
+    # 채널별로 이미 있는 멤버 (처음 일치한 채널만 멤버십 캐시에서 불러옴, 체크포인트에는 저장하지 않음)
+    channel_members = {}
+    # 호출마다 적어도 한 페이지는 처리하여 작업이 항상 앞으로 진행되도록 함
+    page_done = False
+    
+    dispatcher = DryRunDispatcher(job) if dry_run else InviteDispatcher(job)
+    try:
+        # 이전 호출에서 완료되지 않은 초대부터 다시 보내기 (이미 채널에 있는 사용자는 초대 응답에서 제외됨)
+        for channel_id, user_ids in job['pending_invites'].items():
+            dispatcher.add(channel_id, list(user_ids))
+        
+        while not job['crawl_done']:
+            if page_done and not has_time_left(context):
+                return checkpoint_invite_job(job, dispatcher, context)
+            
+            # 페이지마다 필터링 → 이름 추출 → 매칭 → 채널별 초대 계획 → 초대 요청까지 바로 진행
+            for records in iter_member_pages(job):
+                plan = match_member_page(records, index, excluded_index)
+                
+                # 처음 일치한 채널의 멤버 불러오기. 시간이 부족하면 이 페이지를 처리하지 않고
+                # (커서를 넘기지 않았으므로 다음 호출에서 같은 페이지부터) 작업을 넘김
+                for channel_id in plan:
+                    if channel_id in channel_members:
+                        continue
+                    if page_done and not has_time_left(context):
+                        return checkpoint_invite_job(job, dispatcher, context)
+                    channel_members[channel_id] = load_channel_members(channel_id, store=not dry_run)
+                
+                for channel_id, user_ids in plan.items():
+                    members = channel_members[channel_id]
+                    user_ids = [user_id for user_id in user_ids if user_id not in members]
+                    if not user_ids:
+                        continue
+                    job['channel_stats'][channel_id]['matched'] += len(user_ids)
+                    dispatcher.add(channel_id, user_ids)
+                page_done = True
+            
+            # 아직 완료되지 않은 초대 대상을 체크포인트에 함께 저장 (드라이런은 작업을 저장하지 않음)
+            job['pending_invites'] = dispatcher.pending_invites()
+            if not dry_run:
+                save_job(job)
+        
+        # 남은 초대 대상 보내기. 시간이 부족하면 완료되지 않은 대상을 저장하고 작업을 넘김
+        if not dispatcher.drain(context):
+            return checkpoint_invite_job(job, dispatcher, context)
+    finally:
+        dispatcher.shutdown()
+    
+    # 채널별 초대 결과 기록
+    for channel_id, stats in job['channel_stats'].items():
+        print(f"Channel {channel_id}: matched {stats['matched']}, invited {stats['invited']}")
+    
+    job['pending_invites'] = {}
+    job['phase'] = 'completed'
+    job['status'] = 'completed'
+    
+    if dry_run:
+        return dry_run_response(job)
+    
+    save_job(job)
+    
+    if len(job['conventions']) == 1:
+        channel_id = next(iter(job['conventions']))
+        message = f"채널 {channel_id}에 {job['invited_count']}명의 사용자가 초대되었습니다."
+    else:
+        message = f"{len(job['conventions'])}개 채널에 총 {job['invited_count']}명의 사용자가 초대되었습니다."
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': message,
+            'invited_count': job['invited_count'],
+            'channels': job['channel_stats']
+        })
+    }
+
+class InviteDispatcher:
+    """
+    채널별 초대 대상을 모았다가 묶음으로 나누어 스레드 풀로 보내고, 아직 완료되지 않은 사용자 ID를 추적합니다.
+    동시에 진행 중인 요청 수를 제한하여 크롤링이 초대보다 너무 앞서 나가지 않게 합니다.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.executor = ThreadPoolExecutor(max_workers=INVITE_CONCURRENCY)
+        self.in_flight = {}
+        self.buffers = {}
+        self.membership_table = get_membership_table()
+
+    def _collect(self, futures):
+        for future in futures:
+            channel_id, _ = self.in_flight.pop(future)
+            invited_user_ids = future.result()
+            invited_count = len(invited_user_ids)
+            
+            # 초대에 성공한 사용자를 멤버십 캐시에 반영
+            add_members(self.membership_table, channel_id, invited_user_ids)
+            self.job['channel_stats'][channel_id]['invited'] += invited_count
+            self.job['invited_count'] += invited_count
+
+    def _submit(self, channel_id, user_ids):
+        for i in range(0, len(user_ids), INVITE_BATCH_SIZE):
+            # 진행 중인 요청이 너무 많으면 하나가 끝날 때까지 대기
+            while len(self.in_flight) >= INVITE_CONCURRENCY * 2:
+                done, _ = wait(list(self.in_flight), return_when=FIRST_COMPLETED)
+                self._collect(done)
+            
+            chunk = user_ids[i:i + INVITE_BATCH_SIZE]
+            future = self.executor.submit(invite_users_to_channel, chunk, channel_id)
+            self.in_flight[future] = (channel_id, chunk)
+
+    def add(self, channel_id, user_ids):
+        """채널의 초대 대상을 추가하고, 충분히 모이면 요청을 보냅니다."""
+        if not user_ids:
+            return
+        
+        buffer = self.buffers.setdefault(channel_id, [])
+        buffer.extend(user_ids)
+        if len(buffer) >= INVITE_FLUSH_SIZE:
+            self._submit(channel_id, self.buffers.pop(channel_id))
+
+    def pending_invites(self):
+        """아직 보내지 않았거나 완료되지 않은 초대 대상을 채널별로 반환합니다."""
+        self._collect([future for future in self.in_flight if future.done()])
+        
+        pending = {}
+        for channel_id, chunk in self.in_flight.values():
+            pending.setdefault(channel_id, []).extend(chunk)
+        for channel_id, buffer in self.buffers.items():
+            pending.setdefault(channel_id, []).extend(buffer)
+        return pending
+
+    def drain(self, context=None):
+        """
+        모아둔 초대 대상을 보내고 진행 중인 모든 요청이 끝날 때까지 대기합니다.
+        요청이 하나 이상 끝난 뒤 남은 실행 시간이 부족하면 대기를 멈추고 False를 반환합니다.
+        """
+        collected = False
+        while self.buffers or self.in_flight:
+            if collected and not has_time_left(context):
+                return False
+            
+            # 진행 중인 요청 수 제한 안에서 모아둔 대상을 채널별로 보냄
+            if self.buffers and len(self.in_flight) < INVITE_CONCURRENCY * 2:
+                channel_id = next(iter(self.buffers))
+                self._submit(channel_id, self.buffers.pop(channel_id))
+                continue
+            
+            done, _ = wait(list(self.in_flight), timeout=DRAIN_WAIT_SECONDS, return_when=FIRST_COMPLETED)
+            self._collect(done)
+            collected = collected or bool(done)
+        return True
+
+    def cancel(self):
+        """아직 시작하지 않은 초대 요청을 취소합니다. 취소한 대상은 pending_invites로 다음 호출에 넘깁니다."""
+        for future in self.in_flight:
+            future.cancel()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+class DryRunDispatcher:
+    """InviteDispatcher와 같은 인터페이스로 초대 대상을 받기만 하고 Slack에는 요청하지 않습니다."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def add(self, channel_id, user_ids):
+        pass
+
+    def pending_invites(self):
+        return {}
+
+    def drain(self, context=None):
+        return True
+
+    def cancel(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+def match_member_page(records, index, excluded_index):
+    """멤버 레코드 한 페이지를 매칭하여 채널별로 일치하는 사용자 ID 목록을 반환합니다."""
+    plan = {}
+    for record in records:
+        if not is_active_record(record):
+            continue
+        
+        # 변경 전 컨벤션과 이미 일치하던 채널은 제외 (새로 일치하는 채널만 초대)
+        excluded_channels = excluded_index.match(record['user_name'])
+        
+        for channel_id in index.match(record['user_name']):
+            if channel_id not in excluded_channels:
+                plan.setdefault(channel_id, []).append(record['user_id'])
+    return plan
+
+def dry_run_response(job, complete=True):
+    """드라이런 결과(채널별 초대 예정 인원)를 응답으로 만듭니다."""
+    planned_count = sum(stats['matched'] for stats in job['channel_stats'].values())
+    message = f"드라이런: {len(job['conventions'])}개 채널에 총 {planned_count}명의 사용자를 초대할 예정입니다."
+    if not complete:
+        message += " (실행 시간이 부족하여 일부 멤버만 계산했습니다)"
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': message,
+            'dry_run': True,
+            'complete': complete,
+            'planned_count': planned_count,
+            'channels': job['channel_stats']
+        })
+    }
+
+def checkpoint_invite_job(job, dispatcher, context):
+    """
+    체크포인트를 저장하고 새 호출로 작업을 넘깁니다.
+    모아둔 초대 대상과 완료되지 않은 요청은 보내거나 기다리지 않고 pending_invites로 저장하며,
+    아직 시작하지 않은 요청은 취소합니다 (진행 중인 요청은 다음 호출에서 다시 보내도 이미 채널에 있는 사용자로 처리됨).
+    드라이런은 작업을 저장하지 않으므로 이어서 실행하지 않고 지금까지 계산한 결과를 응답합니다.
+    """
+    if job.get('dry_run'):
+        print("Dry run ran out of time, returning partial plan")
+        return dry_run_response(job, complete=False)
+    job['pending_invites'] = dispatcher.pending_invites()
+    dispatcher.cancel()
+    continue_job_async(job, context)
+    return {
+        'statusCode': 202,
+        'body': json.dumps({
+            'message': f"{len(job['conventions'])}개 채널의 초대 작업이 다음 호출에서 계속됩니다.",
+            'job_id': job['job_id'],
+            'invited_count': job['invited_count']
+        })
+    }
+
 def get_channel_convention(channel_id):
     """DynamoDB에서 채널의 네이밍 컨벤션을 조회합니다."""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('slack-invitor')
-        
-        response = table.get_item(
+        response = get_table().get_item(
             Key={
                 'channel_id': channel_id
             }
@@ -94,182 +425,217 @@ def get_channel_convention(channel_id):
         print(f"Error getting channel convention: {str(e)}")
         raise
 
-def get_workspace_members():
-    """Slack API를 사용하여 워크스페이스의 모든 멤버 목록을 가져옵니다."""
+def load_conventions(channel_ids=None):
+    """
+    일괄 초대할 채널 컨벤션을 {channel_id: name_convention} 형태로 가져옵니다.
+    channel_ids가 없으면 컨벤션이 설정된 모든 채널을 가져옵니다.
+    """
+    if channel_ids is None:
+        return {
+            item['channel_id']: item['name_convention']
+            for item in scan_conventions(get_table())
+        }
+    
+    conventions = {}
+    for channel_id in channel_ids:
+        convention = get_channel_convention(channel_id)
+        if convention:
+            conventions[channel_id] = convention
+        else:
+            print(f"No convention set for channel {channel_id}, skipping")
+    return conventions
+
+def iter_member_pages(job):
+    """
+    한 단계에서 처리할 멤버 레코드 페이지를 생성하고, 페이지를 모두 넘기면 작업의 커서를 갱신합니다.
+    멤버 스냅샷이 최신이면 스냅샷 한 페이지를 스캔하고,
+    그렇지 않으면 users.list 한 페이지를 가져오면서 스냅샷도 함께 갱신합니다.
+    """
+    snapshot_table = get_snapshot_table()
+    
+    if job.get('member_source') == 'snapshot':
+        records, next_key = scan_member_page(snapshot_table, job.get('snapshot_cursor'))
+        
+        yield records
+        
+        job['snapshot_cursor'] = next_key
+        if not next_key:
+            job['crawl_done'] = True
+        return
+    
+    members, next_cursor = get_workspace_members_page(job.get('users_cursor'))
+    
+    # 전체 사용자 객체 대신 필요한 필드만 남긴 레코드로 변환하고 원본은 바로 해제
+    records = [to_member_record(member) for member in members]
+    del members
+    
+    yield records
+    
+    # 다음 일괄 초대에서 재사용할 수 있도록 스냅샷 갱신 (드라이런에서는 쓰지 않음)
     try:
-        members = []
-        cursor = None
-        
-        while True:
-            url = "https://slack.com/api/users.list"
-            headers = {
-                "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-                "Content-Type": "application/json"
-            }
-            
-            params = {}
-            if cursor:
-                params['cursor'] = cursor
-            
-            response = requests.get(url, headers=headers, params=params)
-            result = response.json()
-            
-            if not result.get('ok'):
-                print(f"Error fetching members: {result.get('error')}")
-                return None
-            
-            members.extend(result.get('members', []))
-            
-            # 페이지네이션 처리
-            cursor = result.get('response_metadata', {}).get('next_cursor')
-            if not cursor:
-                break
-                
-            # Rate limit 방지를 위한 지연
-            time.sleep(1)
+        if not job.get('dry_run'):
+            write_member_records(snapshot_table, records)
+            if not next_cursor:
+                mark_snapshot_refreshed(snapshot_table, job['crawl_started_at'])
+    except Exception as e:
+        print(f"Error writing member snapshot: {str(e)}")
+    
+    job['users_cursor'] = next_cursor
+    
+    if not next_cursor:
+        job['crawl_done'] = True
+    else:
+        # Rate limit 방지를 위한 지연
+        time.sleep(USERS_LIST_PAGE_DELAY)
+
+def get_workspace_members_page(cursor=None):
+    """Slack API를 사용하여 워크스페이스 멤버 목록 한 페이지와 다음 커서를 가져옵니다."""
+    try:
+        params = {
+            "limit": 200
+        }
+        if cursor:
+            params['cursor'] = cursor
         
-        # 봇 및 삭제된 사용자 필터링
-        active_members = [
-            member for member in members 
-            if not member.get('is_bot', False) 
-            and not member.get('deleted', False)
-            and member.get('id') != 'USLACKBOT'  # Slackbot 제외
-        ]
+        result = call_api('users.list', params=params)
         
-        return active_members
+        if not result.get('ok'):
+            raise Exception(f"Failed to get workspace members: {result.get('error')}")
+        
+        next_cursor = result.get('response_metadata', {}).get('next_cursor')
+        return result.get('members', []), next_cursor
         
     except Exception as e:
         print(f"Error getting workspace members: {str(e)}")
         raise
 
-def invite_matching_members(channel_id, convention, members):
-    """컨벤션과 일치하는 멤버를 채널에 초대합니다."""
+def get_channel_members_page(channel_id, cursor=None):
+    """채널에 이미 있는 멤버 한 페이지(집합)와 다음 커서를 가져옵니다."""
     try:
-        invited_count = 0
+        params = {
+            "channel": channel_id
+        }
         
-        # 와일드카드를 정규식으로 변환
-        if '*' in convention:
-            pattern = convention.replace('*', '.*')
-            regex = re.compile(f"^{pattern}$")
-        else:
-            regex = None
+        if cursor:
+            params['cursor'] = cursor
         
-        # 채널에 이미 있는 멤버 목록 가져오기
-        channel_members = get_channel_members(channel_id)
+        result = call_api('conversations.members', params=params)
         
-        for member in members:
-            user_id = member.get('id')
+        if not result.get('ok'):
+            error = result.get('error')
+            print(f"Error fetching channel members: {error}")
             
-            # 이미 채널에 있는 멤버는 건너뛰기
-            if user_id in channel_members:
-                continue
+            # 채널을 찾을 수 없는 경우 빈 세트 반환
+            if error == 'channel_not_found':
+                return set(), None
                 
-            display_name = member.get('profile', {}).get('display_name', '')
-            real_name = member.get('profile', {}).get('real_name', '')
-            
-            # 사용자 이름 확인 (display_name이 비어있으면 real_name 사용)
-            user_name = display_name if display_name else real_name
-            
-            # 컨벤션과 일치하는지 확인
-            is_match = False
-            if regex:
-                # 와일드카드 패턴 사용
-                is_match = bool(regex.match(user_name))
-            else:
-                # 정확히 일치하는지 확인
-                is_match = (user_name == convention)
-            
-            if is_match:
-                # 사용자를 채널에 초대
-                invite_result = invite_user_to_channel(user_id, channel_id)
-                if invite_result:
-                    invited_count += 1
-                    print(f"Invited user {user_name} (ID: {user_id}) to channel {channel_id}")
-                
-                # Rate limit 방지를 위한 지연
-                time.sleep(0.5)
+            raise Exception(f"Failed to get channel members: {error}")
         
-        return invited_count
+        next_cursor = result.get('response_metadata', {}).get('next_cursor')
+        return set(result.get('members', [])), next_cursor
         
     except Exception as e:
-        print(f"Error inviting matching members: {str(e)}")
+        print(f"Error getting channel members: {str(e)}")
         raise
 
+def load_channel_members(channel_id, store=True):
+    """
+    채널에 이미 있는 멤버 집합을 반환합니다.
+    멤버십 캐시가 있으면 그대로 사용하고, 없거나 정기 재확인 주기가 지났으면
+    conversations.members를 전체 크롤링하여 캐시를 다시 채웁니다. (store가 False이면 캐시에 쓰지 않음)
+    """
+    membership_table = get_membership_table()
+    
+    members = get_cached_members(membership_table, channel_id)
+    if members is not None:
+        print(f"Using cached membership for channel {channel_id} ({len(members)} members)")
+        return members
+    
+    crawled_at = time.time()
+    members = get_channel_members(channel_id)
+    
+    # 봇이 속한 채널은 비어 있을 수 없으므로, 빈 결과(channel_not_found 등)는 캐시하지 않음
+    if members and store:
+        store_members(membership_table, channel_id, members, crawled_at)
+    
+    return members
+
 def get_channel_members(channel_id):
     """채널에 이미 있는 멤버 목록을 가져옵니다."""
-    try:
-        members = set()
-        cursor = None
+    members = set()
+    cursor = None
+    
+    while True:
+        page_members, cursor = get_channel_members_page(channel_id, cursor)
+        members.update(page_members)
         
-        while True:
-            url = "https://slack.com/api/conversations.members"
-            headers = {
-                "Authorization": f"Bearer {SLACK_BOT_TOKEN}"
-            }
+        # 페이지네이션 처리
+        if not cursor:
+            break
             
-            params = {
-                "channel": channel_id
-            }
-            
-            if cursor:
-                params['cursor'] = cursor
-            
-            response = requests.get(url, headers=headers, params=params)
-            result = response.json()
-            
-            if not result.get('ok'):
-                error = result.get('error')
-                print(f"Error fetching channel members: {error}")
-                
-                # 채널을 찾을 수 없는 경우 빈 세트 반환
-                if error == 'channel_not_found':
-                    return set()
-                    
-                raise Exception(f"Failed to get channel members: {error}")
-            
-            members.update(result.get('members', []))
-            
-            # 페이지네이션 처리
-            cursor = result.get('response_metadata', {}).get('next_cursor')
-            if not cursor:
-                break
-                
-            # Rate limit 방지를 위한 지연
-            time.sleep(0.5)
-        
-        return members
-        
-    except Exception as e:
-        print(f"Error getting channel members: {str(e)}")
-        raise
+        # Rate limit 방지를 위한 지연
+        time.sleep(CHANNEL_MEMBERS_PAGE_DELAY)
+    
+    return members
 
-def invite_user_to_channel(user_id, channel_id):
-    """Slack API를 사용하여 사용자를 채널에 초대합니다."""
+def post_invite(user_ids, channel_id):
+    """
+    conversations.invite 요청을 보내고 응답 JSON을 반환합니다.
+    공유 속도 제한기로 요청 속도를 맞추고, 429 응답을 받으면 Retry-After 후 다시 시도합니다.
+    """
+    payload = {
+        "channel": channel_id,
+        "users": ','.join(user_ids),
+        # 일부 사용자가 실패해도 나머지는 초대하고 사용자별 오류를 돌려받음
+        "force": True
+    }
+    
+    return call_api('conversations.invite', json_body=payload, rate_limiter=invite_rate_limiter)
+
+@traced('invite')
+def invite_users_to_channel(user_ids, channel_id):
+    """
+    여러 사용자를 한 번의 conversations.invite 요청으로 채널에 초대합니다.
+    초대되었거나 이미 채널에 있는 사용자 ID 집합을 반환합니다.
+    사용자별 오류(errors)가 오면 실패한 사용자만 제외하고,
+    어떤 사용자 때문에 실패했는지 알 수 없으면 묶음을 절반으로 나누어 다시 시도합니다.
+    """
     try:
-        url = "https://slack.com/api/conversations.invite"
-        headers = {
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "channel": channel_id,
-            "users": user_id
-        }
+        result = post_invite(user_ids, channel_id)
         
-        response = requests.post(url, headers=headers, json=payload)
-        result = response.json()
+        # 사용자별 오류 파싱 (이미 채널에 있는 경우는 성공으로 처리)
+        user_errors = result.get('errors') or []
+        if result.get('ok') or user_errors:
+            failed_user_ids = set()
+            for user_error in user_errors:
+                error = user_error.get('error', 'unknown_error')
+                if error == 'already_in_channel':
+                    continue
+                failed_user_ids.add(user_error.get('user'))
+                print(f"Failed to invite user {user_error.get('user')} to channel {channel_id}: {error}")
+            return set(user_ids) - failed_user_ids
         
-        if result.get('ok'):
-            return True
-        else:
-            error = result.get('error', 'unknown_error')
+        error = result.get('error', 'unknown_error')
+        
+        if len(user_ids) == 1:
             # 이미 채널에 있는 경우는 성공으로 처리
             if error == 'already_in_channel':
-                return True
-            else:
-                print(f"Failed to invite user {user_id} to channel {channel_id}: {error}")
-                return False
+                return set(user_ids)
+            print(f"Failed to invite user {user_ids[0]} to channel {channel_id}: {error}")
+            return set()
+        
+        if error in CHANNEL_LEVEL_ERRORS:
+            print(f"Failed to invite {len(user_ids)} users to channel {channel_id}: {error}")
+            return set()
+        
+        # 실패 원인이 된 사용자를 찾기 위해 묶음을 절반으로 나누어 재시도
+        middle = len(user_ids) // 2
+        print(f"Batch invite to channel {channel_id} failed ({error}), splitting {len(user_ids)} users")
+        return (
+            invite_users_to_channel(user_ids[:middle], channel_id)
+            | invite_users_to_channel(user_ids[middle:], channel_id)
+        )
     
     except Exception as e:
-        print(f"Error inviting user to channel: {str(e)}")
-        return False
+        print(f"Error inviting users to channel: {str(e)}")
+        return set()
@@ -1,45 +1,57 @@
 import json
-import os
-import boto3
-import requests
 from datetime import datetime
-
-# AWS 클라이언트
-dynamodb = boto3.resource('dynamodb')
-bedrock_runtime = boto3.client(
-    service_name='bedrock-runtime',
-    region_name='us-east-1'
+from urllib.parse import unquote_plus
+from convention_store import get_table, get_cached_conventions
+from slack_client import call_api, post_response_url, is_slack_response_url
+from aws_clients import get_client
+from tracing import trace, traced_handler
+from convention_prompt import (
+    select_relevant_conventions, summarize_pattern_families, format_convention_line, estimate_token_count
+)
+from convention_checker import (
+    clean_model_output, repair_candidates, count_snapshot_matches, choose_convention,
+    find_local_recommendation
+)
+from recommendation_cache import (
+    make_cache_key, get_cached_recommendation, claim_recommendation, store_recommendation, release_recommendation
 )
 
 # 환경 변수
-SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
-DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE', 'slack-invitor')
 MODEL_ID = 'amazon.nova-micro-v1:0'  # Nova Micro 모델 ID
+BEDROCK_REGION = 'us-east-1'
 
+@traced_handler
 def lambda_handler(event, context):
     """
     /recommend-convention 슬랙 명령어를 처리하는 Lambda 핸들러 함수
+    캐시된 추천이 있으면 바로 응답하고, 없으면 이 함수를 비동기로 다시 호출하여
+    추천을 생성한 뒤 response_url로 결과를 보냅니다.
     """
-    body = event.get('body', '')
-    if isinstance(body, str):
-        try:
-            if 'isBase64Encoded' in event and event['isBase64Encoded']:
-                import base64
-                body = base64.b64decode(body).decode('utf-8')
+    # 캐시 미스로 비동기 호출된 경우 추천을 생성하여 response_url로 응답
+    if 'recommendation_request' in event:
+        return handle_recommendation_request(event['recommendation_request'])
+    
+    with trace('parse'):
+        body = event.get('body', '')
+        if isinstance(body, str):
+            try:
+                if 'isBase64Encoded' in event and event['isBase64Encoded']:
+                    import base64
+                    body = base64.b64decode(body).decode('utf-8')
             
+                params = {}
+                for item in body.split('&'):
+                    if '=' in item:
+                        key, value = item.split('=', 1)
+                        params[key] = unquote_plus(value)
+            except Exception as e:
+                print(f"요청 본문 파싱 오류: {str(e)}")
+                return {
+                    'statusCode': 400,
+                    'body': json.dumps({'error': '요청 형식이 잘못되었습니다'})
+                }
+        else:
             params = {}
-            for item in body.split('&'):
-                if '=' in item:
-                    key, value = item.split('=', 1)
-                    params[key] = value
-        except Exception as e:
-            print(f"요청 본문 파싱 오류: {str(e)}")
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': '요청 형식이 잘못되었습니다'})
-            }
-    else:
-        params = {}
     
     # 채널 ID 가져오기
     channel_id = params.get('channel_id', '')
@@ -65,44 +77,159 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': '채널 이름을 가져오는데 실패했습니다'})
         }
     
-    # DynamoDB에서 모든 기존 컨벤션 가져오기
+    # DynamoDB에서 모든 기존 컨벤션 가져오기 (웜 컨테이너에서는 버전이 바뀐 경우에만 다시 스캔)
     existing_conventions = get_existing_conventions()
     
-    # Amazon Bedrock을 사용하여 네이밍 컨벤션 추천 생성
-    recommended_convention = generate_convention_recommendation(channel_name, existing_conventions)
+    # 채널 이름과 기존 컨벤션 집합이 같으면 이전에 생성한 추천을 재사용
+    cache_key = make_cache_key(
+        channel_name,
+        ((conv['channel_id'], conv['convention']) for conv in existing_conventions)
+    )
+    cached = get_cached_recommendation(cache_key)
+    if cached:
+        # 충돌 목록은 캐시 키(기존 컨벤션 집합)마다 고정이므로 추천과 함께 저장한 것을 사용
+        print(f"Recommendation cache hit: {channel_name}")
+        recommended_convention, conflicts, conflict_count = cached
+        return build_slack_response(recommendation_message(recommended_convention, conflicts, conflict_count))
+    
+    # 채널 이름으로 만든 패턴이 다른 채널 컨벤션과 겹치지 않으면 Bedrock 없이 바로 추천
+    local_convention = find_local_recommendation(channel_name, existing_conventions, channel_id)
+    if local_convention:
+        print(f"Local recommendation for {channel_name}: {local_convention} (Bedrock skipped)")
+        return build_slack_response(recommendation_message(local_convention))
+    
+    # 캐시 미스: Bedrock 호출은 3초를 넘길 수 있으므로 비동기로 생성하고 response_url로 응답
+    response_url = params.get('response_url')
+    if response_url and not is_slack_response_url(response_url):
+        print(f"Invalid response_url: {response_url}")
+        return build_slack_response('잘못된 요청입니다.', 'ephemeral')
+    if response_url and context is not None and hasattr(context, 'invoked_function_arn'):
+        if not claim_recommendation(cache_key):
+            print(f"Recommendation already in progress: {channel_name}")
+            return build_slack_response('이 채널의 추천 컨벤션을 생성하고 있습니다. 잠시 후 다시 시도해주세요.', 'ephemeral')
+        
+        try:
+            invoke_recommendation_async(context, {
+                'channel_id': channel_id,
+                'channel_name': channel_name,
+                'cache_key': cache_key,
+                'response_url': response_url
+            })
+        except Exception as e:
+            print(f"Error invoking recommendation lambda: {str(e)}")
+            release_recommendation(cache_key)
+            return build_slack_response(f'추천 요청에 실패했습니다: {str(e)}', 'ephemeral')
+        
+        return build_slack_response('추천 컨벤션을 생성하고 있습니다. 완료되면 이 채널에 표시됩니다.', 'ephemeral')
+    
+    # response_url이 없는 직접 호출은 동기로 생성
+    recommended_convention, conflicts = recommend_and_cache(channel_name, existing_conventions, cache_key, channel_id)
+    return build_slack_response(recommendation_message(recommended_convention, conflicts))
+
+def recommendation_message(recommended_convention, conflicts=(), conflict_count=None):
+    """
+    추천 결과를 슬랙 메시지 텍스트로 만듭니다. 다른 채널 컨벤션과 겹치면 경고를 덧붙입니다.
+    conflict_count는 캐시에 일부만 저장된 충돌 목록의 전체 수입니다 (없으면 목록 길이).
+    """
+    text = f"이 채널에 추천하는 네이밍 컨벤션: `{recommended_convention}`\n\n이 컨벤션을 설정하려면: `/set-convention {recommended_convention}`"
     
-    # 슬랙에 응답 보내기
-    response_text = f"이 채널에 추천하는 네이밍 컨벤션: `{recommended_convention}`\n\n이 컨벤션을 설정하려면: `/set-convention {recommended_convention}`"
+    if conflict_count is None:
+        conflict_count = len(conflicts)
+    if conflicts:
+        lines = [
+            f"• <#{channel_id}> `{convention}` (예: `{example}`)"
+            for channel_id, convention, example in conflicts[:5]
+        ]
+        if conflict_count > 5:
+            lines.append(f"• 외 {conflict_count - 5}개 채널")
+        text += "\n\n⚠️ 이 컨벤션은 다음 채널의 컨벤션과 일치하는 이름이 겹칩니다:\n" + "\n".join(lines)
     
+    return text
+
+def build_slack_response(text, response_type='in_channel'):
+    """슬래시 명령어 응답을 만듭니다. in_channel이면 채널에 공개적으로 표시됩니다."""
     return {
         'statusCode': 200,
         'body': json.dumps({
-            'response_type': 'in_channel',  # 채널에 공개적으로 표시
-            'text': response_text
+            'response_type': response_type,
+            'text': text
         }),
         'headers': {
             'Content-Type': 'application/json'
         }
     }
 
+def invoke_recommendation_async(context, request):
+    """같은 Lambda 함수를 비동기로 다시 호출하여 추천을 생성합니다."""
+    response = get_client('lambda').invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',  # 비동기 호출
+        Payload=json.dumps({
+            'recommendation_request': request
+        })
+    )
+    print(f"Recommendation invocation response: {response.get('StatusCode')}")
+
+def handle_recommendation_request(request):
+    """비동기 호출에서 추천을 생성하고 캐시에 저장한 뒤 response_url로 결과를 보냅니다."""
+    channel_name = request['channel_name']
+    cache_key = request['cache_key']
+    
+    recommended_convention, conflicts = recommend_and_cache(
+        channel_name, get_existing_conventions(), cache_key, request.get('channel_id')
+    )
+    
+    post_response_url(request['response_url'], {
+        'response_type': 'in_channel',
+        'text': recommendation_message(recommended_convention, conflicts)
+    })
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'recommendation': recommended_convention})
+    }
+
+def recommend_and_cache(channel_name, existing_conventions, cache_key, channel_id=None):
+    """
+    Bedrock으로 추천을 생성하고, 다른 채널 컨벤션과의 충돌과 멤버 스냅샷으로 검증한 뒤 캐시에 저장합니다.
+    추천이 충돌하면 범위를 좁힌 패턴이나 채널 이름으로 만든 패턴으로 바꿉니다.
+    Bedrock 호출에 실패하면 채널 이름으로 만든 패턴을 반환하고 캐시에는 저장하지 않습니다.
+    반환값: (추천 컨벤션, 남은 충돌 목록)
+    """
+    try:
+        model_convention = clean_model_output(invoke_bedrock(channel_name, existing_conventions))
+    except Exception as e:
+        print(f"Bedrock 호출 오류: {str(e)}")
+        model_convention = ''
+    
+    candidates = repair_candidates(model_convention, channel_name)
+    match_counts, total_members = count_snapshot_matches(candidates)
+    recommended_convention, conflicts = choose_convention(
+        candidates, existing_conventions, channel_id, match_counts, total_members
+    )
+    
+    if model_convention and recommended_convention != model_convention:
+        print(f"Model recommendation {model_convention} repaired to {recommended_convention}")
+    if conflicts:
+        print(f"Recommendation {recommended_convention} overlaps {len(conflicts)} existing conventions")
+    
+    if not model_convention:
+        release_recommendation(cache_key)
+    else:
+        store_recommendation(cache_key, recommended_convention, conflicts)
+    return recommended_convention, conflicts
+
 def get_channel_info(channel_id):
     """
     슬랙 API에서 채널 정보 가져오기
     """
-    url = 'https://slack.com/api/conversations.info'
-    headers = {
-        'Authorization': f'Bearer {SLACK_BOT_TOKEN}',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
     params = {
         'channel': channel_id
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response_data = response.json()
+        response_data = call_api('conversations.info', params=params)
         
-        if response.status_code == 200 and response_data.get('ok', False):
+        if response_data.get('ok', False):
             return response_data
         else:
             return {'error': response_data.get('error', '알 수 없는 오류')}
@@ -113,76 +240,75 @@ def get_existing_conventions():
     """
     DynamoDB에서 모든 기존 네이밍 컨벤션 가져오기
     """
-    table = dynamodb.Table(DYNAMODB_TABLE)
+    table = get_table()
     
     try:
-        # 테이블 스캔하여 모든 항목 가져오기
-        response = table.scan()
-        items = response.get('Items', [])
-        
-        # 더 많은 항목이 있는 경우 계속 스캔 (페이지네이션)
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
-        
-        # 컨벤션과 채널 ID 추출
+        # 버전 메타 항목이 바뀐 경우에만 테이블을 다시 스캔하는 공용 컨벤션 캐시 사용
         conventions = []
-        for item in items:
-            if 'name_convention' in item and item['name_convention']:
-                conventions.append({
-                    'channel_id': item.get('channel_id', ''),
-                    'convention': item.get('name_convention', '')
-                })
+        for item in get_cached_conventions(table)[0]:
+            conventions.append({
+                'channel_id': item.get('channel_id', ''),
+                'convention': item.get('name_convention', '')
+            })
         
         return conventions
     except Exception as e:
         print(f"DynamoDB에서 컨벤션 가져오기 오류: {str(e)}")
         return []
 
-def generate_convention_recommendation(channel_name, existing_conventions):
+def invoke_bedrock(channel_name, existing_conventions):
     """
-    Amazon Bedrock을 사용하여 네이밍 컨벤션 추천 생성
+    Bedrock Nova 모델을 호출하여 추천 컨벤션 텍스트를 반환합니다. 호출에 실패하면 예외가 발생합니다.
     """
     # Bedrock을 위한 프롬프트 생성
     prompt_text = create_bedrock_prompt(channel_name, existing_conventions)
+    estimated_tokens = estimate_token_count(prompt_text)
     
-    try:
-        # Nova 모델 요청 형식 (Claude와 다름)
-        request_body = {
-            "inputText": prompt_text,
-            "textGenerationConfig": {
-                "maxTokenCount": 100,
-                "temperature": 0.5,
-                "topP": 0.5,
-                "stopSequences": []
-            }
+    # Nova 모델 요청 형식 (Claude와 다름)
+    request_body = {
+        "inputText": prompt_text,
+        "textGenerationConfig": {
+            "maxTokenCount": 100,
+            "temperature": 0.5,
+            "topP": 0.5,
+            "stopSequences": []
         }
-        
-        # API 호출
+    }
+    
+    # API 호출
+    # Bedrock 클라이언트는 처음 호출할 때 만들고 웜 컨테이너에서 재사용
+    bedrock_runtime = get_client('bedrock-runtime', region_name=BEDROCK_REGION)
+    with trace('bedrock.invoke_model'):
         response = bedrock_runtime.invoke_model(
             modelId=MODEL_ID,
             body=json.dumps(request_body)
         )
-        
-        # 응답 파싱 (Nova 응답 형식에 맞춤)
-        response_body = json.loads(response['body'].read())
-        generated_text = response_body.get('results', [{}])[0].get('outputText', '').strip()
-        
-        return generated_text
-    except Exception as e:
-        print(f"Bedrock 호출 오류: {str(e)}")
-        # 실패 시 기본 추천
-        return f"{channel_name.lower()}*"
+    
+    # 응답 파싱 (Nova 응답 형식에 맞춤)
+    response_body = json.loads(response['body'].read())
+    generated_text = response_body.get('results', [{}])[0].get('outputText', '').strip()
+    
+    # 요청별 프롬프트 토큰 수 기록 (응답에 실제 토큰 수가 있으면 함께 기록)
+    print(
+        f"Prompt tokens for {channel_name}: estimated {estimated_tokens}, "
+        f"actual {response_body.get('inputTextTokenCount', 'unknown')} "
+        f"({len(existing_conventions)} existing conventions)"
+    )
+    
+    return generated_text
 
 def create_bedrock_prompt(channel_name, existing_conventions):
     """
     Amazon Bedrock에 전달할 프롬프트 생성
+    채널 이름과 비슷한(충돌 가능성이 높은) 컨벤션만 그대로 넣고, 나머지는 패턴 계열별 개수로 요약하여
+    기존 컨벤션 수와 관계없이 프롬프트 크기를 일정하게 유지합니다.
     """
-    conventions_list = []
-    for conv in existing_conventions:
-        channel_id = conv.get('channel_id', '')
-        convention = conv.get('convention', '')
-        conventions_list.append(f"- 채널 ID: {channel_id}, 컨벤션: {convention}")
+    relevant, rest = select_relevant_conventions(channel_name, existing_conventions)
+    
+    conventions_list = [format_convention_line(conv) for conv in relevant]
+    if rest:
+        conventions_list.append(f"- 그 밖의 컨벤션 {len(rest)}개 (패턴 계열별 개수):")
+        conventions_list.extend(summarize_pattern_families(rest))
     
     conventions_text = "\n".join(conventions_list) if conventions_list else "기존 컨벤션이 없습니다."
     
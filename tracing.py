@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import random
+import functools
+import threading
+from contextlib import contextmanager
+
+# 환경 변수
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'SlackInvitor')
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+# 수신한 이벤트 전체를 로그에 남기는 비율 (0이면 남기지 않음)
+EVENT_LOG_SAMPLE_RATE = float(os.environ.get('EVENT_LOG_SAMPLE_RATE', '0.01'))
+
+# EMF 지표 하나에 담을 수 있는 값의 최대 개수
+_EMF_MAX_VALUES = 100
+
+# 한 번의 호출 동안 모으는 단계별 소요 시간(ms)과 카운터. 초대 스레드에서도 기록하므로 잠금 사용
+_timings = {}
+_counters = {}
+_lock = threading.Lock()
+
+def record_timing(stage, elapsed_ms):
+    """단계 소요 시간(ms)을 기록합니다."""
+    with _lock:
+        _timings.setdefault(stage, []).append(elapsed_ms)
+
+def increment(name, value=1):
+    """카운터를 증가시킵니다. 예: slack.calls, slack.retries, slack.ratelimited"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+@contextmanager
+def trace(stage):
+    """
+    with 블록의 소요 시간을 단계 이름으로 기록합니다.
+    예: with trace('dynamodb.get_item'): table.get_item(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, (time.perf_counter() - start) * 1000)
+
+def traced(stage):
+    """함수 호출의 소요 시간을 단계 이름으로 기록하는 데코레이터입니다."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def percentile(sorted_values, fraction):
+    """정렬된 값에서 nearest-rank 방식으로 백분위수를 구합니다."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(len(sorted_values) * fraction + 0.999999) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def _sample_values(values):
+    """EMF 값 개수 제한에 맞게 고르게 골라냅니다."""
+    if len(values) <= _EMF_MAX_VALUES:
+        return values
+    step = len(values) / _EMF_MAX_VALUES
+    return [values[int(i * step)] for i in range(_EMF_MAX_VALUES)]
+
+def build_emf_record(function_name, timings, counters):
+    """
+    CloudWatch Embedded Metric Format 로그 레코드를 만듭니다.
+    단계별 소요 시간은 측정값 배열로 보내 CloudWatch에서 p50/p99 통계를 구할 수 있게 하고,
+    이번 호출의 p50/p99/횟수는 로그 검색용 속성으로 함께 남깁니다.
+    """
+    metrics = []
+    record = {'FunctionName': function_name}
+
+    for stage, values in sorted(timings.items()):
+        ordered = sorted(values)
+        metrics.append({'Name': stage, 'Unit': 'Milliseconds'})
+        record[stage] = [round(value, 3) for value in _sample_values(values)]
+        record[f"{stage}.count"] = len(values)
+        record[f"{stage}.p50"] = round(percentile(ordered, 0.5), 3)
+        record[f"{stage}.p99"] = round(percentile(ordered, 0.99), 3)
+
+    for name, value in sorted(counters.items()):
+        metrics.append({'Name': name, 'Unit': 'Count'})
+        record[name] = value
+
+    record['_aws'] = {
+        'Timestamp': int(time.time() * 1000),
+        'CloudWatchMetrics': [{
+            'Namespace': METRICS_NAMESPACE,
+            'Dimensions': [['FunctionName']],
+            'Metrics': metrics
+        }]
+    }
+    return record
+
+def flush_metrics(function_name=None):
+    """모은 지표를 EMF 한 줄로 출력하고 비웁니다. 기록된 지표가 없으면 출력하지 않습니다."""
+    with _lock:
+        timings = dict(_timings)
+        counters = dict(_counters)
+        _timings.clear()
+        _counters.clear()
+
+    if not METRICS_ENABLED or not (timings or counters):
+        return
+
+    function_name = function_name or os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+    print(json.dumps(build_emf_record(function_name, timings, counters), ensure_ascii=False))
+
+def log_event(event):
+    """
+    수신한 이벤트 전체를 EVENT_LOG_SAMPLE_RATE 비율로만 로그에 남깁니다.
+    큰 base64 본문을 매번 직렬화하지 않도록 샘플링되지 않은 호출에서는 아무것도 하지 않습니다.
+    """
+    if EVENT_LOG_SAMPLE_RATE > 0 and random.random() < EVENT_LOG_SAMPLE_RATE:
+        print(f"Received event (sampled): {json.dumps(event, ensure_ascii=False)}")
+
+def traced_handler(handler):
+    """
+    Lambda 핸들러 데코레이터입니다. 호출 전체 시간을 'handler' 단계로 기록하고,
+    이벤트를 샘플링하여 로그에 남기며, 호출이 끝나면 지표를 EMF로 출력합니다.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        try:
+            with trace('handler'):
+                return handler(event, context)
+        finally:
+            log_event(event)
+            flush_metrics(getattr(context, 'function_name', None))
+    return wrapper
@@ -0,0 +1,76 @@
+import os
+import datetime
+from aws_clients import get_dynamodb_table
+
+# 환경 변수
+USER_STATE_TABLE = os.environ.get('USER_STATE_TABLE', 'slack-invitor-users')
+
+def get_user_state_table():
+    """사용자 상태 테이블 객체를 반환합니다. 한 번 만든 객체는 재사용합니다."""
+    return get_dynamodb_table(USER_STATE_TABLE)
+
+def get_user_state(table, user_id):
+    """사용자 상태를 읽기만 합니다. 없거나 읽을 수 없으면 빈 dict를 반환합니다."""
+    try:
+        response = table.get_item(
+            Key={
+                'user_id': user_id
+            },
+            ConsistentRead=True
+        )
+        return response.get('Item', {})
+    except Exception as e:
+        print(f"Error reading user state: {str(e)}")
+        return {}
+
+def record_user_name(table, user_id, user_name, previous_name=None):
+    """
+    초대를 모두 마친 뒤 사용자의 마지막 이름을 기록합니다.
+    상태를 읽은 뒤 다른 이벤트가 이름을 먼저 기록했다면 덮어쓰지 않도록, 읽었던 이름(previous_name)과
+    같을 때만 조건부로 업데이트합니다. 기록했으면 True를 반환합니다.
+    """
+    current_datetime = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    values = {
+        ':name': user_name,
+        ':ud': current_datetime
+    }
+    if previous_name is None:
+        condition = 'attribute_not_exists(user_name)'
+    else:
+        condition = 'user_name = :previous'
+        values[':previous'] = previous_name
+
+    try:
+        table.update_item(
+            Key={
+                'user_id': user_id
+            },
+            UpdateExpression='SET user_name = :name, updated_date = :ud',
+            ConditionExpression=condition,
+            ExpressionAttributeValues=values
+        )
+        return True
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"User name of {user_id} was recorded by another event, skipping")
+        return False
+    except Exception as e:
+        print(f"Error recording user name: {str(e)}")
+        return False
+
+def add_granted_channels(table, user_id, channel_ids):
+    """사용자가 초대된 채널을 기록합니다."""
+    if not channel_ids:
+        return
+
+    try:
+        table.update_item(
+            Key={
+                'user_id': user_id
+            },
+            UpdateExpression='ADD granted_channels :channels',
+            ExpressionAttributeValues={
+                ':channels': set(channel_ids)
+            }
+        )
+    except Exception as e:
+        print(f"Error recording granted channels: {str(e)}")